@@ -0,0 +1,14 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.async_db import dataset_version
+from services.response_cache import ResponseCache, create_backend
+from services.fast_json import dumps
+
+# Shared by the cached routes; backend chosen by FUTUREATLAS_CACHE_BACKEND
+response_cache = ResponseCache(create_backend(), dataset_version)
+
+
+def json_body(content) -> bytes:
+    """Serialize like the app's default FastJSONResponse, so cached and uncached bodies are byte-identical"""
+    return dumps(content)
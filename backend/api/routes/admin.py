@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Optional
+import secrets
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from config import settings
+from api.cache import response_cache
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Checks X-Admin-Token; the endpoints are disabled unless FUTUREATLAS_ADMIN_TOKEN is set"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set FUTUREATLAS_ADMIN_TOKEN")
+    if not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/cache")
+async def cache_stats():
+    """Response cache backend and this worker's hit/miss counts per endpoint"""
+    return response_cache.stats()
+
+@router.post("/admin/cache/flush")
+async def flush_cache(reset_stats: bool = False):
+    """Drop every cached response (in every worker's shared store for the redis backend)"""
+    await response_cache.flush()
+    if reset_stats:
+        response_cache.reset_stats()
+    return {"flushed": True, **response_cache.stats()}
@@ -1,24 +1,33 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from typing import List
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from data.database import db
+from data.async_db import adb
+from api.cache import response_cache, json_body
 
 router = APIRouter()
 
 @router.get("/countries")
 async def get_countries() -> List[dict]:
     """Get list of all countries"""
-    return db.get_countries()
+    body = await response_cache.get_or_build("countries", None, _countries_body)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/countries/{iso}")
 async def get_country(iso: str):
     """Get specific country information"""
-    countries = db.get_countries()
+    body = await response_cache.get_or_build("country", iso.lower(), lambda: _country_body(iso))
+    return Response(content=body, media_type="application/json")
+
+async def _countries_body() -> bytes:
+    return json_body(await adb.get_countries())
+
+async def _country_body(iso: str) -> bytes:
+    countries = await adb.get_countries()
     country = next((c for c in countries if c['iso3'].lower() == iso.lower()), None)
     
     if not country:
         raise HTTPException(status_code=404, detail="Country not found")
     
-    return country
+    return json_body(country)
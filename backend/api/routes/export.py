@@ -0,0 +1,85 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse, Response
+from typing import Optional
+import csv
+import io
+import json
+import math
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from data.database import db
+from data.async_db import run_blocking
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _split(value: Optional[str]):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+def _without_nan(row) -> list:
+    """NaN metrics as None: an empty CSV field, like NDJSON's null"""
+    return [None if isinstance(v, float) and math.isnan(v) else v for v in row]
+
+def _csv_stream(query):
+    header_written = False
+    for columns, batch in db.stream_rows(query):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(_without_nan(row) for row in batch)
+        yield buffer.getvalue()
+
+def _ndjson_stream(query):
+    for columns, batch in db.stream_rows(query):
+        lines = []
+        for row in batch:
+            record = dict(zip(columns, _without_nan(row)))
+            lines.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        yield "\n".join(lines) + "\n"
+
+def _parquet_bytes(query) -> bytes:
+    # Columnar format: fetch once and write in a single pass
+    import pandas as pd
+    db.initialize()
+    with db.engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+@router.get("/export")
+async def export_data(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    year_from: Optional[int] = Query(None, alias="from"),
+    year_to: Optional[int] = Query(None, alias="to"),
+    regions: Optional[str] = Query(None, description="Comma-separated region names"),
+    isos: Optional[str] = Query(None, description="Comma-separated ISO3 codes"),
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics; all if omitted")
+):
+    """Export the yearly dataset as streamed CSV/NDJSON or a Parquet file"""
+    requested_metrics = [m.lower() for m in _split(metrics)] if metrics else list(db.EXPORT_METRICS)
+    unknown = [m for m in requested_metrics if m not in db.EXPORT_METRICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    
+    query = db.export_query(requested_metrics, year_from, year_to, _split(regions), _split(isos))
+    headers = {"Content-Disposition": f'attachment; filename="futureatlas_export.{format}"'}
+    
+    if format == "parquet":
+        try:
+            body = await run_blocking(_parquet_bytes, query)
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+        return Response(content=body, media_type=MEDIA_TYPES[format], headers=headers)
+    
+    # Starlette iterates these sync generators in its threadpool, one batch at a time
+    stream = _csv_stream(query) if format == "csv" else _ndjson_stream(query)
+    return StreamingResponse(stream, media_type=MEDIA_TYPES[format], headers=headers)
@@ -1,18 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from data.database import db
+from data.async_db import run_blocking, dataset_version
 from services.gsi_calculator import GSICalculator
+from services.insights_cache import InsightsCache
+from services.single_flight import flight
+from api.cache import response_cache, json_body
 
 router = APIRouter()
 gsi_calculator = GSICalculator()
+insights_cache = InsightsCache(db, gsi_calculator)
+insights_flight = flight("insights", dataset_version)
+batch_flight = flight("insights_batch", dataset_version)
+
+MAX_BATCH_SIZE = 250
+
+@router.get("/insights")
+async def get_insights_batch(isos: str = Query(..., description="Comma-separated ISO3 codes")) -> Dict:
+    """Get insights for many countries in one call"""
+    requested = [iso.strip().lower() for iso in isos.split(",") if iso.strip()]
+    if len(requested) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} countries per request")
+    requested = tuple(dict.fromkeys(requested))
+    # The response cache is keyed by dataset version; the weights are added here, as in InsightsCache
+    key = (requested, insights_cache.weights())
+    body = await response_cache.get_or_build("insights_batch", key, lambda: _batch_body(requested, key))
+    return Response(content=body, media_type="application/json")
 
 @router.get("/insights/{iso}")
 async def get_insights(iso: str) -> Dict:
     """Get auto-generated insights for a country"""
-    data = db.get_country_data(iso.lower())
+    iso = iso.lower()
+    key = (iso, insights_cache.weights())
+    body = await response_cache.get_or_build("insights", key, lambda: _insights_body(iso, key))
+    return Response(content=body, media_type="application/json")
+
+async def _insights_body(iso: str, key: tuple) -> bytes:
+    return json_body(await insights_flight.do(key, run_blocking, insights_cache.get, iso, build_insights))
+
+async def _batch_body(requested: tuple, key: tuple) -> bytes:
+    return json_body(await batch_flight.do(key, run_blocking, insights_batch, requested))
+
+def insights_batch(requested) -> Dict:
+    data, missing = [], []
+    for iso in requested:
+        try:
+            data.append(insights_cache.get(iso, build_insights))
+        except HTTPException:
+            missing.append(iso)
+    return {"data": data, "missing": missing}
+
+def build_insights(iso: str) -> Dict:
+    """Generate insights for one country; raises 404 if it lacks 2023 or 2050 data"""
+    data = db.cube.country_frame(iso)
     
     if data is None:
         raise HTTPException(status_code=404, detail="Country data not found")
@@ -37,10 +80,7 @@ async def get_insights(iso: str) -> Dict:
     gsi_change = future['gsi'] - current['gsi']
     
     # Get ranking for 2050
-    all_data = db.get_all_countries_data()
-    result_df = gsi_calculator.calculate_gsi_for_countries(all_data, 2050)
-    rank_row = result_df[result_df['iso'] == iso.lower()]
-    rank = int(rank_row['rank'].iloc[0]) if not rank_row.empty else None
+    rank = insights_cache.rank_table().get(iso)
     
     # Generate insights
     insights = []
@@ -84,7 +124,7 @@ async def get_insights(iso: str) -> Dict:
         insights.append("Maintaining stable position in global power rankings.")
     
     return {
-        "iso": iso.lower(),
+        "iso": iso,
         "current": {
             "year": 2023,
             "gdp": round(float(current['gdp']), 2),
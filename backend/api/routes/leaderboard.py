@@ -1,70 +1,37 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from typing import List, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from data.database import db
-from services.gsi_calculator import GSICalculator
+from data.async_db import run_blocking, dataset_version
 from models.country import LeaderboardEntry
+from services.leaderboard_snapshots import LeaderboardSnapshotStore, etag_matches
+from services.single_flight import flight
+from api.cache import response_cache
 
 router = APIRouter()
-gsi_calculator = GSICalculator()
+snapshots = LeaderboardSnapshotStore(db)
+leaderboard_flight = flight("leaderboard", dataset_version)
 
-@router.get("/leaderboard")
-async def get_leaderboard(year: int = Query(2050, ge=2020, le=2050)):
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def get_leaderboard(
+    year: int = Query(2050, ge=2020, le=2050),
+    if_none_match: Optional[str] = Header(None)
+):
     """Get top 20 countries leaderboard for a specific year"""
-    all_data = db.get_all_countries_data()
-    countries = db.get_countries()
+    cached = await response_cache.get_or_build("leaderboard", year, lambda: _snapshot_entry(year))
+    etag, body = cached.split(b"\n", 1)
+    etag = etag.decode()
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
     
-    # Filter out excluded countries
-    excluded_isos = {c['iso3'].lower() for c in countries if c.get('exclude_from_leaderboard')}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     
-    # Create dataframe from pre-calculated data
-    entries = []
-    for iso, df in all_data.items():
-        year_row = df[df['year'] == year]
-        if not year_row.empty:
-            row = year_row.iloc[0]
-            entries.append({
-                'iso': iso,
-                'gdp': row['gdp'],
-                'population': row['population'],
-                'military': row['military'],
-                'gsi': row.get('gsi', 0)
-            })
-    
-    result_df = pd.DataFrame(entries)
-    if not result_df.empty:
-        result_df = result_df.sort_values('gsi', ascending=False).reset_index(drop=True)
-        result_df['rank'] = result_df.index + 1
-    else:
-        result_df = pd.DataFrame() # Handle empty case
-    
-    # Filter result_df to exclude countries in excluded_isos
-    # Assuming result_df involves 'iso' column or index. Let's check potential structure or filter after.
-    # Looking at lines 30+, it uses row['iso'].
-    
-    if not result_df.empty:
-        result_df = result_df[~result_df['iso'].isin(excluded_isos)]
-    
-    # Get top 20
-    top_20 = result_df.head(20)
-    
-    # Map ISO codes to country names
-    iso_to_name = {c['iso3'].lower(): c['name'] for c in countries}
-    
-    leaderboard = []
-    for _, row in top_20.iterrows():
-        iso = row['iso']
-        leaderboard.append({
-            "rank": int(row['rank']),
-            "iso": iso,
-            "name": iso_to_name.get(iso, iso.upper()),
-            "gdp": round(float(row['gdp']), 2),
-            "population": round(float(row['population']), 2),
-            "military": round(float(row['military']), 2),
-            "gsi": round(float(row['gsi']), 4)
-        })
-    
-    return leaderboard
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _snapshot_entry(year: int) -> bytes:
+    """The snapshot's ETag and body, cached together so requests never re-hash the body"""
+    # Usually a dict lookup, but a dataset change rebuilds every year's snapshot
+    snapshot = await leaderboard_flight.do(year, run_blocking, snapshots.get, year)
+    return snapshot.etag.encode() + b"\n" + snapshot.body
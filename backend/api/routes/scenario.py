@@ -1,75 +1,119 @@
 from fastapi import APIRouter, HTTPException
-import pandas as pd
+from typing import List
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from models.country import ScenarioRequest, ScenarioResponse
+from models.country import ScenarioRequest, ScenarioResponse, ScenarioSweepRequest, ScenarioSweepResponse
 from data.database import db
+from data.async_db import run_blocking, dataset_version
 from services.gsi_calculator import GSICalculator
+from services.scenario_engine import ScenarioEngine, GDP, POPULATION, MILITARY
+from services.single_flight import flight
 
 router = APIRouter()
 gsi_calculator = GSICalculator()
+engine = ScenarioEngine(db, gsi_calculator)
+scenario_flight = flight("scenario", dataset_version)
+batch_flight = flight("scenario_batch", dataset_version)
+sweep_flight = flight("scenario_sweep", dataset_version)
 
-@router.post("/scenario", response_model=ScenarioResponse)
-async def run_scenario(request: ScenarioRequest):
-    """Run what-if scenario simulation"""
-    data = db.get_country_data(request.iso.lower())
-    
-    if data is None:
+MAX_BATCH_SIZE = 1000
+MAX_SWEEP_POINTS = 10000
+
+def _params(request: ScenarioRequest) -> tuple:
+    """Normalized single-flight key for one scenario"""
+    return (request.iso.lower(), request.year, request.military_change_percent, request.population_change_percent)
+
+def _locate(iso: str, year: int):
+    """Year state and row for a country, or 404"""
+    iso = iso.lower()
+    if iso not in db.cube.iso_index:
         raise HTTPException(status_code=404, detail="Country data not found")
     
-    # Get original data for the year
-    year_data = data[data['year'] == request.year]
-    if year_data.empty:
-        raise HTTPException(status_code=404, detail=f"No data for year {request.year}")
-    
-    original_data = year_data.iloc[0].copy()
-    
-    # Calculate original GSI - need all countries for normalization
-    all_data = db.get_all_countries_data()
-    all_year_data = []
-    country_index = None
-    
-    for idx, (iso, df) in enumerate(all_data.items()):
-        year_row = df[df['year'] == request.year]
-        if not year_row.empty:
-            row = year_row.iloc[0].copy()
-            if iso == request.iso.lower():
-                country_index = len(all_year_data)
-            all_year_data.append({
-                'iso': iso,
-                'gdp': row['gdp'],
-                'population': row['population'],
-                'military': row['military']
-            })
-    
-    # Calculate original GSI
-    original_df = pd.DataFrame(all_year_data)
-    original_gsi_df = gsi_calculator.calculate_gsi(original_df)
-    original_gsi = float(original_gsi_df.iloc[country_index]['gsi'])
-    
-    # Apply scenario changes
-    new_military = original_data['military'] * (1 + request.military_change_percent / 100)
-    new_population = original_data['population'] * (1 + request.population_change_percent / 100)
-    
-    # Recalculate GSI with modified values
-    modified_year_data = all_year_data.copy()
-    modified_year_data[country_index]['military'] = new_military
-    modified_year_data[country_index]['population'] = new_population
-    
-    modified_df = pd.DataFrame(modified_year_data)
-    new_gsi_df = gsi_calculator.calculate_gsi(modified_df)
-    new_gsi = float(new_gsi_df.iloc[country_index]['gsi'])
-    
+    state = engine.year_state(year)
+    row = state.row_of.get(iso) if state is not None else None
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"No data for year {year}")
+    return state, row
+
+def _response(result: dict, i=()) -> ScenarioResponse:
+    original, modified = result["original"][i], result["modified"][i]
+    original_gsi, new_gsi = float(result["original_gsi"][i]), float(result["new_gsi"][i])
     return ScenarioResponse(
         original_gsi=round(original_gsi, 4),
         new_gsi=round(new_gsi, 4),
         gsi_change=round(new_gsi - original_gsi, 4),
         details={
-            "original_military": round(float(original_data['military']), 2),
-            "new_military": round(float(new_military), 2),
-            "original_population": round(float(original_data['population']), 2),
-            "new_population": round(float(new_population), 2),
-            "gdp": round(float(original_data['gdp']), 2)
+            "original_military": round(float(original[MILITARY]), 2),
+            "new_military": round(float(modified[MILITARY]), 2),
+            "original_population": round(float(original[POPULATION]), 2),
+            "new_population": round(float(modified[POPULATION]), 2),
+            "gdp": round(float(original[GDP]), 2)
         }
     )
+
+@router.post("/scenario", response_model=ScenarioResponse)
+async def run_scenario(request: ScenarioRequest):
+    """Run what-if scenario simulation"""
+    return await scenario_flight.do(_params(request), run_blocking, evaluate_one, request)
+
+@router.post("/scenario/batch", response_model=List[ScenarioResponse])
+async def run_scenario_batch(requests: List[ScenarioRequest]):
+    """Run many what-if scenarios, evaluated together per year"""
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} scenarios per batch")
+    params = tuple(_params(r) for r in requests)
+    return await batch_flight.do(params, run_blocking, evaluate_batch, requests)
+
+@router.post("/scenario/sweep", response_model=ScenarioSweepResponse)
+async def run_scenario_sweep(request: ScenarioSweepRequest):
+    """Evaluate a grid of military x population changes for one country in a single pass"""
+    if len(request.military_change_percents) * len(request.population_change_percents) > MAX_SWEEP_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SWEEP_POINTS} grid points per sweep")
+    params = (request.iso.lower(), request.year,
+              tuple(request.military_change_percents), tuple(request.population_change_percents))
+    return await sweep_flight.do(params, run_blocking, evaluate_sweep, request)
+
+# Evaluation runs on the worker pool so large batches and sweeps don't stall the event loop
+
+def evaluate_one(request: ScenarioRequest) -> ScenarioResponse:
+    state, row = _locate(request.iso, request.year)
+    result = engine.evaluate(state, row, request.military_change_percent, request.population_change_percent)
+    return _response(result)
+
+def evaluate_batch(requests: List[ScenarioRequest]) -> List[ScenarioResponse]:
+    located = [_locate(r.iso, r.year) for r in requests]
+    responses: List[ScenarioResponse] = [None] * len(requests)
+    
+    by_year = {}
+    for i, request in enumerate(requests):
+        by_year.setdefault(request.year, []).append(i)
+    
+    for year, indices in by_year.items():
+        state = located[indices[0]][0]
+        result = engine.evaluate(
+            state,
+            [located[i][1] for i in indices],
+            [requests[i].military_change_percent for i in indices],
+            [requests[i].population_change_percent for i in indices]
+        )
+        for k, i in enumerate(indices):
+            responses[i] = _response(result, k)
+    
+    return responses
+
+def evaluate_sweep(request: ScenarioSweepRequest) -> ScenarioSweepResponse:
+    military = np.asarray(request.military_change_percents, dtype=np.float64)
+    population = np.asarray(request.population_change_percents, dtype=np.float64)
+    state, row = _locate(request.iso, request.year)
+    result = engine.evaluate(state, row, military[:, None], population[None, :])
+    
+    return ScenarioSweepResponse(
+        iso=request.iso.lower(),
+        year=request.year,
+        original_gsi=round(float(state.gsi[row]), 4),
+        military_change_percents=military.tolist(),
+        population_change_percents=population.tolist(),
+        new_gsi=np.round(result["new_gsi"], 4).tolist()
+    )
@@ -1,34 +1,106 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
+import numpy as np
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from data.database import db
-from services.gsi_calculator import GSICalculator
+from models.country import TimeSeriesData
+from pydantic import TypeAdapter
+from data.async_db import run_blocking
+from api.cache import response_cache, json_body
 
 router = APIRouter()
-gsi_calculator = GSICalculator()
+
+# Single-country payloads are validated when built (once per dataset version), not per request
+SERIES_ADAPTER = TypeAdapter(List[TimeSeriesData])
+
+@router.get("/timeseries")
+async def get_timeseries_bulk(
+    isos: Optional[str] = Query(None, description="Comma-separated ISO3 codes; all countries if omitted"),
+    metrics: Optional[str] = Query(None, description="Comma-separated metrics; all if omitted"),
+    year_from: Optional[int] = Query(None, alias="from"),
+    year_to: Optional[int] = Query(None, alias="to")
+):
+    """Get many countries' series in one columnar payload: years once, then per-country metric arrays"""
+    params = (isos, metrics, year_from, year_to)
+    body = await response_cache.get_or_build(
+        "timeseries_bulk", params, lambda: run_blocking(lambda: json_body(bulk_payload(*params)))
+    )
+    return Response(content=body, media_type="application/json")
 
 @router.get("/timeseries/{iso}")
 async def get_timeseries(iso: str):
     """Get historical and forecast data for a country"""
-    data = db.get_country_data(iso.lower())
+    body = await response_cache.get_or_build(
+        "timeseries", iso.lower(), lambda: run_blocking(lambda: json_body(series_payload(iso)))
+    )
+    return Response(content=body, media_type="application/json")
+
+def bulk_payload(isos: Optional[str], metrics: Optional[str], year_from: Optional[int], year_to: Optional[int]) -> dict:
+    """Columnar payload for GET /timeseries, built off the event loop"""
+    cube = db.cube
+    
+    if metrics:
+        requested_metrics = [m.strip().lower() for m in metrics.split(",") if m.strip()]
+        unknown = [m for m in requested_metrics if m not in cube.metric_index]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    else:
+        requested_metrics = list(cube.METRICS)
+    
+    if isos:
+        requested_isos = list(dict.fromkeys(iso.strip().lower() for iso in isos.split(",") if iso.strip()))
+    else:
+        requested_isos = list(cube.isos)
+    
+    found = [iso for iso in requested_isos if iso in cube.iso_index]
+    missing = [iso for iso in requested_isos if iso not in cube.iso_index]
+    
+    year_mask = np.ones(len(cube.years), dtype=bool)
+    if year_from is not None:
+        year_mask &= cube.years >= year_from
+    if year_to is not None:
+        year_mask &= cube.years <= year_to
+    
+    rows = np.array([cube.iso_index[iso] for iso in found], dtype=np.int64)
+    columns = [cube.metric_index[m] for m in requested_metrics]
+    # (countries, metrics, years), made contiguous so each country's metric is a row the
+    # encoder writes straight from the buffer (NaN becomes null)
+    block = np.ascontiguousarray(cube.values[rows][:, year_mask][:, :, columns].transpose(0, 2, 1))
+    
+    data = {
+        iso: dict(zip(requested_metrics, country_block))
+        for iso, country_block in zip(found, block)
+    }
+    
+    return {
+        "years": cube.years[year_mask],
+        "metrics": requested_metrics,
+        "data": data,
+        "missing": missing
+    }
+
+def series_payload(iso: str) -> dict:
+    """Row-per-year payload for GET /timeseries/{iso}"""
+    series = db.cube.country_series(iso.lower())
     
-    if data is None:
+    if series is None:
         raise HTTPException(status_code=404, detail="Country data not found")
     
+    years, values = series
     
     result_data = []
-    for _, row in data.iterrows():
+    for year, (gdp, population, military, gsi) in zip(years.tolist(), values.tolist()):
         result_data.append({
-            'year': int(row['year']),
-            'gdp': float(row['gdp']),
-            'population': float(row['population']),
-            'military': float(row['military']),
-            'gsi': float(row.get('gsi', 0))  # Use pre-calculated GSI
+            'year': year,
+            'gdp': gdp,
+            'population': population,
+            'military': military,
+            'gsi': gsi  # Use pre-calculated GSI
         })
     
+    SERIES_ADAPTER.validate_python(result_data)
     return {
         "iso": iso.lower(),
         "data": result_data
@@ -0,0 +1,95 @@
+"""Import cost of the API module, as measured by ``python -X importtime``.
+
+Imports ``main`` in fresh interpreters and reports the median total import
+time, peak RSS after import, and the slowest top-level packages:
+
+    python benchmarks/import_time.py --runs 5 --top 15
+    python benchmarks/import_time.py --budget-ms 2500 --json import_time.json
+
+With ``--budget-ms`` the script exits non-zero when the median exceeds the
+budget, so CI can track regressions (e.g. a heavy library imported at module top).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import main, then report peak RSS (KiB on Linux) on the last stdout line
+PROBE = "import main, resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str = "main") -> dict:
+    """One fresh-interpreter import: total microseconds, per-package self time and peak RSS"""
+    probe = PROBE.replace("import main", f"import {module}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        own, cumulative = int(match.group(1)), int(match.group(2))
+        indent, name = len(match.group(3)), match.group(4)
+        if indent == 1:
+            # Outermost import: its cumulative time includes everything it pulled in
+            total += cumulative
+        # Attribute each module's own time to its top-level package (pandas, sqlalchemy, ...)
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + own
+    return {
+        "total_us": total,
+        "packages_us": packages,
+        "max_rss_kib": int(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import from the backend directory")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level packages to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the median import time exceeds this")
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(1, args.runs))]
+    median_ms = statistics.median(r["total_us"] for r in runs) / 1000
+    rss_mib = statistics.median(r["max_rss_kib"] for r in runs) / 1024
+    packages = {
+        name: statistics.median(r["packages_us"].get(name, 0) for r in runs) / 1000
+        for name in set().union(*(r["packages_us"] for r in runs))
+    }
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"import {args.module}: {median_ms:.0f} ms median over {len(runs)} runs, peak RSS {rss_mib:.0f} MiB")
+    for name, ms in slowest:
+        print(f"  {name:<24} {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "module": args.module,
+                "runs": len(runs),
+                "median_ms": median_ms,
+                "peak_rss_mib": rss_mib,
+                "packages_ms": dict(slowest),
+                "budget_ms": args.budget_ms,
+            }, f, indent=2)
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"Import time {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Mixed HTTP + WebSocket load test for one backend process.
+
+Starts uvicorn locally (or targets --url), opens N /ws connections subscribed
+to random years while HTTP workers replay a weighted mix of leaderboard,
+timeseries, insights and scenario calls. Each step reports:
+
+  - tick lag: how late live frames arrive relative to the broadcast interval
+  - latency percentiles per endpoint, and error counts
+  - dropped frames (sequence gaps on protocol 2, missed ticks on protocol 1) and evictions
+  - server RSS growth (when the server was started by this script)
+
+Steps run with increasing client counts; the capacity is the largest step whose
+p99 tick lag stays under --max-lag with no dropped frames and <1% HTTP errors:
+
+    python benchmarks/load_test.py --clients 250 500 1000 2000 --duration 20
+    python benchmarks/load_test.py --scale medium --clients 1000 --json load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+import httpx
+import websockets
+
+UPDATE_INTERVAL = 2.0  # main.UPDATE_INTERVAL
+
+# (name, weight) of the HTTP traffic a dashboard generates
+ENDPOINT_MIX = (
+    ("leaderboard", 40),
+    ("timeseries", 15),
+    ("timeseries_bulk", 10),
+    ("insights", 20),
+    ("scenario", 10),
+    ("scenario_sweep", 5),
+)
+YEARS = range(2020, 2051)
+
+
+def percentile(values, q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def make_request(name: str, rng: random.Random, isos):
+    """(method, path, json body) for one call of an endpoint with randomised parameters"""
+    iso = rng.choice(isos)
+    year = rng.choice(YEARS)
+    if name == "leaderboard":
+        return "GET", f"/api/leaderboard?year={year}", None
+    if name == "timeseries":
+        return "GET", f"/api/timeseries/{iso}", None
+    if name == "timeseries_bulk":
+        return "GET", f"/api/timeseries?isos={','.join(rng.sample(isos, min(5, len(isos))))}", None
+    if name == "insights":
+        return "GET", f"/api/insights/{iso}", None
+    if name == "scenario":
+        return "POST", "/api/scenario", {
+            "iso": iso, "year": year,
+            "military_change_percent": rng.choice(range(-50, 55, 5)),
+            "population_change_percent": rng.choice(range(-20, 25, 5)),
+        }
+    return "POST", "/api/scenario/sweep", {"iso": iso, "year": year}
+
+
+class StepStats:
+    def __init__(self):
+        self.latencies = {name: [] for name, _ in ENDPOINT_MIX}
+        self.errors = {name: 0 for name, _ in ENDPOINT_MIX}
+        self.tick_lags = []
+        self.frames = 0
+        self.seq_gaps = 0
+        self.missed_ticks = 0
+        self.connected = 0
+        self.connect_failures = 0
+        self.disconnects = 0
+
+
+async def http_worker(client: httpx.AsyncClient, rng: random.Random, isos, stats: StepStats, stop_at: float, think: float):
+    names = [name for name, _ in ENDPOINT_MIX]
+    weights = [weight for _, weight in ENDPOINT_MIX]
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, path, body = make_request(name, rng, isos)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            if response.status_code != 200:
+                stats.errors[name] += 1
+        except Exception:
+            stats.errors[name] += 1
+        stats.latencies[name].append(time.perf_counter() - start)
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def ws_client(url: str, year: int, protocol: int, stats: StepStats, stop_at: float, gate: asyncio.Semaphore):
+    """One dashboard: subscribe, then time every broadcast frame until the step ends"""
+    try:
+        async with gate:
+            ws = await websockets.connect(url, max_size=None, open_timeout=30, ping_interval=None)
+    except Exception:
+        stats.connect_failures += 1
+        return
+    stats.connected += 1
+    try:
+        subscribe = {"year": year, "protocol": protocol} if protocol == 2 else {"year": year}
+        await ws.send(json.dumps(subscribe))
+        first = True
+        last_frame = None
+        last_seq = None
+        while True:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            now = time.monotonic()
+            if protocol == 2:
+                # Every tick advances the year's sequence; the server keyframes past any gap.
+                # A tick landing before the subscription is applied arrives as a plain list.
+                frame = json.loads(message)
+                if isinstance(frame, dict):
+                    if last_seq is not None:
+                        stats.seq_gaps += max(0, frame["seq"] - last_seq - 1)
+                    last_seq = frame["seq"]
+            if first:
+                # Immediate reply to the subscription, not a broadcast tick
+                first = False
+                continue
+            stats.frames += 1
+            if last_frame is not None:
+                gap = now - last_frame
+                stats.tick_lags.append(max(0.0, gap - UPDATE_INTERVAL))
+                if protocol != 2:
+                    stats.missed_ticks += max(0, round(gap / UPDATE_INTERVAL) - 1)
+            last_frame = now
+    except websockets.ConnectionClosed:
+        stats.disconnects += 1
+    finally:
+        await ws.close()
+
+
+def server_rss_mib(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_step(base_url: str, clients: int, http_workers: int, duration: float, think: float,
+                   protocol2_share: float, seed: int, isos, server_pid=None) -> dict:
+    rng = random.Random(seed)
+    stats = StepStats()
+    ws_url = base_url.replace("http", "ws", 1) + "/ws"
+    rss_before = server_rss_mib(server_pid) if server_pid else None
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30,
+                                 limits=httpx.Limits(max_connections=http_workers * 2)) as client:
+        live_before = (await client.get("/api/live/stats")).json()
+        # Connect everyone first (bounded handshakes), then measure for `duration`
+        gate = asyncio.Semaphore(200)
+        stop_at = time.monotonic() + duration + clients / 500 + 5
+        ws_tasks = [
+            asyncio.create_task(ws_client(
+                ws_url, rng.choice(YEARS), 2 if rng.random() < protocol2_share else 1, stats, stop_at, gate
+            ))
+            for _ in range(clients)
+        ]
+        http_stop = time.monotonic() + duration
+        http_tasks = [
+            asyncio.create_task(http_worker(client, random.Random(seed * 1000 + i), isos, stats, http_stop, think))
+            for i in range(http_workers)
+        ]
+        await asyncio.gather(*http_tasks)
+        await asyncio.gather(*ws_tasks)
+        live_after = (await client.get("/api/live/stats")).json()
+
+    rss_after = server_rss_mib(server_pid) if server_pid else None
+    requests = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    endpoints = {}
+    for name, values in stats.latencies.items():
+        if values:
+            endpoints[name] = {
+                "count": len(values),
+                "errors": stats.errors[name],
+                "p50_ms": percentile(values, 50) * 1000,
+                "p90_ms": percentile(values, 90) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+    lags = stats.tick_lags
+    return {
+        "clients": clients,
+        "connected": stats.connected,
+        "connect_failures": stats.connect_failures,
+        "disconnects": stats.disconnects,
+        "http_requests": requests,
+        "http_rps": requests / duration,
+        "http_error_rate": errors / requests if requests else 0.0,
+        "endpoints": endpoints,
+        "frames": stats.frames,
+        "tick_lag_p50_ms": (percentile(lags, 50) or 0) * 1000,
+        "tick_lag_p99_ms": (percentile(lags, 99) or 0) * 1000,
+        "tick_lag_max_ms": (max(lags) if lags else 0) * 1000,
+        "server_max_tick_ms": live_after.get("max_tick_seconds", 0) * 1000,
+        "server_max_fanout_ms": live_after.get("max_fanout_seconds", 0) * 1000,
+        "dropped_frames": stats.seq_gaps + stats.missed_ticks,
+        "evicted": live_after.get("evicted", 0) - live_before.get("evicted", 0),
+        "rss_before_mib": rss_before,
+        "rss_after_mib": rss_after,
+    }
+
+
+def passes(step: dict, max_lag_ms: float) -> bool:
+    return (step["connect_failures"] == 0 and step["dropped_frames"] == 0 and step["evicted"] == 0
+            and step["tick_lag_p99_ms"] <= max_lag_ms and step["http_error_rate"] < 0.01)
+
+
+def start_server(port: int, scale: str, seed: int):
+    env = dict(os.environ)
+    if scale:
+        from benchmarks.synthetic import dataset_path
+        env["FUTUREATLAS_DB_PATH"] = dataset_path(scale, seed)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=5) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become ready within {timeout:.0f}s")
+
+
+def print_step(step: dict, ok: bool):
+    rss = ""
+    if step["rss_before_mib"] is not None and step["rss_after_mib"] is not None:
+        rss = f"  rss {step['rss_before_mib']:.0f} -> {step['rss_after_mib']:.0f} MiB"
+    print(f"\n{step['clients']} clients ({step['connected']} connected): {'PASS' if ok else 'FAIL'}")
+    print(f"  tick lag p50 {step['tick_lag_p50_ms']:.0f} ms, p99 {step['tick_lag_p99_ms']:.0f} ms, "
+          f"max {step['tick_lag_max_ms']:.0f} ms; server max tick {step['server_max_tick_ms']:.0f} ms, "
+          f"fan-out {step['server_max_fanout_ms']:.0f} ms")
+    print(f"  frames {step['frames']}, dropped {step['dropped_frames']}, evicted {step['evicted']}, "
+          f"disconnects {step['disconnects']}{rss}")
+    print(f"  http {step['http_requests']} requests ({step['http_rps']:.0f}/s), error rate {step['http_error_rate']:.2%}")
+    for name, e in step["endpoints"].items():
+        print(f"    {name:<16} p50 {e['p50_ms']:7.1f}  p90 {e['p90_ms']:7.1f}  p99 {e['p99_ms']:7.1f}  max {e['max_ms']:7.1f} ms"
+              f"  ({e['count']}, {e['errors']} errors)")
+
+
+async def run(args) -> dict:
+    server = None
+    base_url = args.url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.port, args.scale, args.seed)
+    try:
+        await wait_ready(base_url)
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            isos = [c["iso3"] for c in (await client.get("/api/countries")).json()]
+        steps, capacity = [], 0
+        for clients in args.clients:
+            step = await run_step(base_url, clients, args.http_workers, args.duration, args.think,
+                                  args.protocol2_share, args.seed, isos, server.pid if server else None)
+            ok = passes(step, args.max_lag)
+            step["pass"] = ok
+            steps.append(step)
+            print_step(step, ok)
+            if ok:
+                capacity = clients
+            elif args.stop_on_fail:
+                break
+        print(f"\nCapacity: {capacity} concurrent dashboards with {args.http_workers} HTTP workers "
+              f"(p99 tick lag <= {args.max_lag:.0f} ms, no drops)")
+        return {"capacity": capacity, "settings": vars(args), "steps": steps}
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 250, 500, 1000], help="WebSocket clients per step")
+    parser.add_argument("--http-workers", type=int, default=20, help="Concurrent HTTP request loops")
+    parser.add_argument("--think", type=float, default=0.05, help="Mean pause between a worker's requests (seconds)")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of HTTP traffic per step")
+    parser.add_argument("--protocol2-share", type=float, default=0.5, help="Fraction of sockets using delta frames")
+    parser.add_argument("--max-lag", type=float, default=500.0, help="p99 tick lag (ms) a step may reach and still pass")
+    parser.add_argument("--stop-on-fail", action="store_true")
+    parser.add_argument("--url", default=None, help="Target a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scale", default=None, help="Serve a synthetic dataset (today, medium, large) instead of the real one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write all step results to this file")
+    args = parser.parse_args()
+
+    # Thousands of sockets need file descriptors on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    report = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
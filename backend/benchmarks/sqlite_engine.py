@@ -0,0 +1,84 @@
+"""Read throughput of the default SQLite engine vs the tuned engine factory.
+
+Runs the per-country series query from several threads against a copy of
+futureatlas.db and reports queries per second for each configuration:
+
+    python benchmarks/sqlite_engine.py --threads 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from config import Settings
+from data.database import Database
+from data.engine import create_sqlite_engine
+
+
+def run(engine, isos, threads: int, seconds: float, write_every: int = 0) -> float:
+    """Queries per second across all threads; optionally mix in a write every N reads"""
+    stop = time.monotonic() + seconds
+    counts = [0] * threads
+    errors = [0] * threads
+
+    def worker(n):
+        rng = random.Random(n)
+        while time.monotonic() < stop:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(Database.country_query(rng.choice(isos))).fetchall()
+                    counts[n] += 1
+                    if write_every and counts[n] % write_every == 0:
+                        conn.exec_driver_sql("UPDATE yearly_data SET gsi = gsi WHERE id = 1")
+                        conn.commit()
+            except Exception:
+                errors[n] += 1
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if sum(errors):
+        print(f"  {sum(errors)} errors (e.g. database is locked)")
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-every", type=int, default=50, help="Mix in one write per N reads per thread (0 = read only)")
+    args = parser.parse_args()
+
+    source = Settings().database_path
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in ("default", "tuned"):
+            path = os.path.join(tmp, f"{name}.db")
+            shutil.copy(source, path)
+            if name == "default":
+                # What Database used before the engine factory
+                engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+                with engine.begin() as conn:
+                    conn.exec_driver_sql("PRAGMA journal_mode = DELETE")
+            else:
+                settings = Settings()
+                settings.database_path = path
+                engine = create_sqlite_engine(settings)
+            with engine.connect() as conn:
+                isos = [row[0] for row in conn.exec_driver_sql("SELECT iso3 FROM countries")]
+            results[name] = run(engine, isos, args.threads, args.seconds, args.write_every)
+            engine.dispose()
+            print(f"{name:>8}: {results[name]:,.0f} queries/s")
+        print(f"speedup: {results['tuned'] / results['default']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
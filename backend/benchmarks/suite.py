@@ -0,0 +1,333 @@
+"""Benchmark suite for the GSI services, data access, API routes and /ws fan-out.
+
+Each scale runs in a fresh interpreter against a synthetic database (see
+benchmarks/synthetic.py), from today's size up to 10k entities x 600 periods:
+
+    python benchmarks/suite.py                              # today + medium
+    python benchmarks/suite.py --scales today medium large --output results.json
+    python benchmarks/suite.py --filter route. --compare results.json
+
+Results (per-benchmark rounds, min/median/mean/stddev seconds) are written as
+JSON tagged with the git commit; --compare prints median ratios against an
+earlier file and, with --fail-above, exits non-zero on regressions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+from benchmarks.synthetic import SCALES, DEFAULT_DATA_DIR, dataset_path
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BENCHMARKS = []
+
+
+def benchmark(name: str, min_rounds: int = 5):
+    """Register ``func(ctx)`` as a benchmark"""
+    def register(func):
+        BENCHMARKS.append((name, func, min_rounds))
+        return func
+    return register
+
+
+def measure(func, min_rounds: int, max_time: float, max_rounds: int = 1000) -> dict:
+    """Time repeated calls after one warm-up: at least ``min_rounds``, then until ``max_time`` is spent"""
+    func()
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_rounds or (time.perf_counter() - started < max_time and len(times) < max_rounds):
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+    return {
+        "rounds": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "max": max(times),
+    }
+
+
+class Context:
+    """Objects shared by the benchmarks of one scale, built once per worker"""
+
+    def __init__(self, ws_clients: int):
+        from fastapi.testclient import TestClient
+        import main
+        from data.database import db
+
+        db.initialize()
+        self.main = main
+        self.db = db
+        self.cube = db.cube
+        self.client = TestClient(main.app)
+        self.ws_clients = ws_clients
+        self.year = int(self.cube.years[-1])
+        self.iso = self.cube.isos[0]
+        self.isos = list(self.cube.isos[:50])
+        self.isos_param = ",".join(self.isos)
+        self.all_data = db.get_all_countries_data()
+
+    def clear_caches(self):
+        """Drop response and insights caches so routes measure their compute path"""
+        from api.cache import response_cache
+        from api.routes.insights import insights_cache
+        response_cache.backend.clear()
+        insights_cache.entries.clear()
+
+
+# Core services
+
+@benchmark("gsi.calculate_gsi")
+def bench_calculate_gsi(ctx):
+    from services.gsi_calculator import GSICalculator
+    calculator, frame = GSICalculator(), ctx.cube.year_frame(ctx.year)
+    return lambda: calculator.calculate_gsi(frame)
+
+
+@benchmark("gsi.calculate_gsi_for_countries", min_rounds=3)
+def bench_calculate_gsi_for_countries(ctx):
+    from services.gsi_calculator import GSICalculator
+    calculator = GSICalculator()
+    return lambda: calculator.calculate_gsi_for_countries(ctx.all_data, ctx.year)
+
+
+@benchmark("gsi.calculate_gsi_panel", min_rounds=3)
+def bench_calculate_gsi_panel(ctx):
+    from services.gsi_calculator import GSICalculator, PANEL_METRICS
+    calculator = GSICalculator()
+    metrics = [ctx.cube.metric_index[m] for m in PANEL_METRICS]
+    panel = ctx.cube.values[:, :, metrics].transpose(1, 0, 2).copy()
+    return lambda: calculator.calculate_gsi_panel(panel)
+
+
+@benchmark("db.get_all_countries_data", min_rounds=3)
+def bench_get_all_countries_data(ctx):
+    return ctx.db.get_all_countries_data
+
+
+@benchmark("db.refresh_cube", min_rounds=3)
+def bench_refresh_cube(ctx):
+    return ctx.db.refresh_cube
+
+
+@benchmark("scenario.year_state")
+def bench_year_state(ctx):
+    from api.routes.scenario import engine
+
+    def run():
+        engine.states.clear()
+        engine.year_state(ctx.year)
+    return run
+
+
+@benchmark("scenario.evaluate_sweep_101x101")
+def bench_scenario_sweep(ctx):
+    import numpy as np
+    from api.routes.scenario import engine
+    state = engine.year_state(ctx.year)
+    row = state.row_of[ctx.iso]
+    grid = np.linspace(-50, 50, 101)
+    return lambda: engine.evaluate(state, row, grid[:, None], grid[None, :])
+
+
+# Routes through TestClient (caches cleared before each call)
+
+def _route(method: str, url: str, **kwargs):
+    def setup(ctx):
+        def run():
+            ctx.clear_caches()
+            response = ctx.client.request(method, url.format(ctx=ctx), **kwargs)
+            assert response.status_code == 200, (url, response.status_code, response.text[:200])
+        return run
+    return setup
+
+
+def _route_json(method: str, url: str, body):
+    def setup(ctx):
+        def run():
+            ctx.clear_caches()
+            response = ctx.client.request(method, url, json=body(ctx))
+            assert response.status_code == 200, (url, response.status_code, response.text[:200])
+        return run
+    return setup
+
+
+benchmark("route.countries")(_route("GET", "/api/countries"))
+benchmark("route.country")(_route("GET", "/api/countries/{ctx.iso}"))
+benchmark("route.timeseries_country")(_route("GET", "/api/timeseries/{ctx.iso}"))
+benchmark("route.timeseries_bulk_50")(_route("GET", "/api/timeseries?isos={ctx.isos_param}"))
+benchmark("route.leaderboard")(_route("GET", "/api/leaderboard?year=2050"))
+benchmark("route.insights_country")(_route("GET", "/api/insights/{ctx.iso}"))
+benchmark("route.insights_batch_50")(_route("GET", "/api/insights?isos={ctx.isos_param}"))
+benchmark("route.export_csv_50")(_route("GET", "/api/export?format=csv&isos={ctx.isos_param}"))
+benchmark("route.scenario")(_route_json("POST", "/api/scenario", lambda ctx: {
+    "iso": ctx.iso, "year": 2050, "military_change_percent": 10, "population_change_percent": -5
+}))
+benchmark("route.scenario_batch_100")(_route_json("POST", "/api/scenario/batch", lambda ctx: [
+    {"iso": iso, "year": 2050, "military_change_percent": i % 21 - 10, "population_change_percent": i % 7 - 3}
+    for i, iso in enumerate((ctx.isos * 2)[:100])
+]))
+benchmark("route.scenario_sweep")(_route_json("POST", "/api/scenario/sweep", lambda ctx: {"iso": ctx.iso, "year": 2050}))
+
+
+@benchmark("route.leaderboard_cached")
+def bench_leaderboard_cached(ctx):
+    return lambda: ctx.client.get("/api/leaderboard?year=2050")
+
+
+# /ws fan-out
+
+class FakeWebSocket:
+    """Accepts frames instantly, like a fast client on a local network"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def send_text(self, data):
+        self.frames += 1
+
+    async def send_bytes(self, data):
+        self.frames += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+@benchmark("ws.broadcast_tick")
+def bench_ws_fanout(ctx):
+    """One broadcast tick to N clients spread over 10 years, half on the delta protocol.
+
+    Produces the tick on an in-process bus and fans out what arrives, as periodic_updates and relay do.
+    """
+    from services.broadcast_bus import InProcessBus
+    from services.live_protocol import ClientState, PROTOCOL_DELTA
+    manager = ctx.main.ConnectionManager()
+    bus = InProcessBus()
+    years = [2050 - i for i in range(10)]
+    for i in range(ctx.ws_clients):
+        ws = FakeWebSocket()
+        manager.active_connections.append(ws)
+        manager.connection_years[ws] = years[i % len(years)]
+        manager.client_states[ws] = ClientState(protocol=PROTOCOL_DELTA if i % 2 else 1)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(bus.announce(manager.subscribed_years()))
+    ticks = bus.ticks()
+
+    async def tick():
+        received = asyncio.ensure_future(ticks.__anext__())
+        # Let the fan-out side start waiting (and subscribe, on the first round) before the tick is published
+        await asyncio.sleep(0)
+        await manager.produce(bus)
+        await manager.fan_out_tick(await received)
+
+    return lambda: loop.run_until_complete(tick())
+
+
+def run_worker(scale: str, output: str, seed: int, data_dir: str, max_time: float, ws_clients: int, name_filter: str):
+    os.environ["FUTUREATLAS_DB_PATH"] = dataset_path(scale, seed, data_dir)
+    os.environ.setdefault("FUTUREATLAS_CACHE_BACKEND", "memory")
+    ctx = Context(ws_clients)
+    entities, periods = SCALES[scale]
+
+    results = []
+    for name, setup, min_rounds in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        stats = measure(setup(ctx), min_rounds, max_time)
+        results.append({"scale": scale, "entities": entities, "periods": periods, "name": name, **stats})
+        print(f"  {scale:<7} {name:<36} median {stats['median'] * 1000:10.3f} ms  ({stats['rounds']} rounds)", flush=True)
+    with open(output, "w") as f:
+        json.dump(results, f)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str, fail_above: float = None) -> bool:
+    """Print median ratios against a baseline file; False if any exceeds ``fail_above``"""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["name"]): r for r in json.load(f)["results"]}
+    ok = True
+    print(f"\nCompared with {baseline_path} (median, new / old):")
+    for r in results:
+        old = baseline.get((r["scale"], r["name"]))
+        if old is None:
+            continue
+        ratio = r["median"] / old["median"] if old["median"] else float("inf")
+        flag = ""
+        if fail_above is not None and ratio > fail_above:
+            flag, ok = "  REGRESSION", False
+        print(f"  {r['scale']:<7} {r['name']:<36} {ratio:6.2f}x{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["today", "medium"], choices=list(SCALES))
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--max-time", type=float, default=1.0, help="Seconds to spend per benchmark after its minimum rounds")
+    parser.add_argument("--ws-clients", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where synthetic databases are built and reused")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare medians against")
+    parser.add_argument("--fail-above", type=float, default=None, help="With --compare, fail if any median ratio exceeds this")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.worker_output, args.seed, args.data_dir, args.max_time, args.ws_clients, args.filter)
+        return
+
+    commit = _git_commit()
+    results = []
+    for scale in args.scales:
+        # A fresh interpreter per scale: the app binds its database at import time
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            worker_output = tmp.name
+        try:
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--worker", scale, "--worker-output", worker_output,
+                "--seed", str(args.seed), "--data-dir", args.data_dir, "--max-time", str(args.max_time),
+                "--ws-clients", str(args.ws_clients), "--filter", args.filter,
+            ], cwd=BACKEND_DIR, check=True)
+            with open(worker_output) as f:
+                results += json.load(f)
+        finally:
+            os.remove(worker_output)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Saved {len(results)} results to {output}")
+
+    if args.compare and not compare(results, args.compare, args.fail_above):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Synthetic FutureAtlas datasets for benchmarks and load tests.
+
+Builds a SQLite file with the production schema holding ``entities`` countries
+over ``periods`` consecutive periods (labelled as years ending at 2050, so every
+route's default year exists), with GSI precomputed like the real seed data.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# name -> (entities, periods); "today" matches the seeded database
+SCALES = {
+    "today": (212, 51),
+    "medium": (1000, 120),
+    "large": (10000, 600),
+}
+LAST_PERIOD = 2050
+REGIONS = ("Africa", "Asia", "Europe", "North America", "Oceania", "South America")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "futureatlas-bench")
+
+
+def synthetic_panel(entities: int, periods: int, seed: int = 0) -> np.ndarray:
+    """(periods, entities, metric) panel in PANEL_METRICS order: lognormal bases with per-entity growth"""
+    from services.gsi_calculator import PANEL_METRICS
+    rng = np.random.default_rng(seed)
+    base = {
+        'gdp': rng.lognormal(mean=4.0, sigma=2.0, size=entities),
+        'population': rng.lognormal(mean=2.5, sigma=1.8, size=entities),
+        'military': rng.lognormal(mean=0.5, sigma=2.0, size=entities),
+    }
+    t = np.arange(periods, dtype=np.float64)[:, None]
+    panel = np.empty((periods, entities, len(PANEL_METRICS)))
+    for i, metric in enumerate(PANEL_METRICS):
+        growth = rng.normal(0.02 if metric != 'population' else 0.005, 0.01, size=entities)
+        noise = rng.normal(1.0, 0.01, size=(periods, entities))
+        panel[:, :, i] = base[metric] * (1 + growth) ** t * noise
+    return panel
+
+
+def build_database(path: str, entities: int, periods: int, seed: int = 0, exclude_every: int = 25):
+    """Write a synthetic database to ``path`` (replacing it) with the production schema and indexes"""
+    from sqlalchemy import create_engine
+    from data.models import Base
+    from services.gsi_calculator import GSICalculator, PANEL_METRICS
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    panel = synthetic_panel(entities, periods, seed)
+    gsi, _ = GSICalculator().calculate_gsi_panel(panel)
+    years = np.arange(LAST_PERIOD - periods + 1, LAST_PERIOD + 1)
+
+    countries = [
+        (i + 1, f"e{i:05d}", f"e{i:05d}", f"Entity {i}", REGIONS[i % len(REGIONS)], exclude_every > 0 and i % exclude_every == exclude_every - 1)
+        for i in range(entities)
+    ]
+    ids = np.tile(np.arange(1, entities + 1), periods)
+    columns = [ids, np.repeat(years, entities)] + [panel[:, :, i].ravel() for i in range(len(PANEL_METRICS))] + [gsi.ravel()]
+    metric_names = ", ".join(PANEL_METRICS)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        with conn:
+            conn.executemany("INSERT INTO countries (id, iso, iso3, name, region, exclude_from_leaderboard) VALUES (?, ?, ?, ?, ?, ?)", countries)
+            conn.executemany(
+                f"INSERT INTO yearly_data (country_id, year, {metric_names}, gsi) VALUES (?, ?, ?, ?, ?, ?)",
+                zip(*(c.tolist() for c in columns))
+            )
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def dataset_path(scale: str, seed: int = 0, data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """Path of a scale's database, building it on first use"""
+    entities, periods = SCALES[scale]
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{scale}-{entities}x{periods}-seed{seed}.db")
+    if not os.path.exists(path):
+        print(f"Building synthetic {scale} dataset ({entities} x {periods}) at {path}...")
+        build_database(path + ".tmp", entities, periods, seed)
+        os.replace(path + ".tmp", path)
+    return path
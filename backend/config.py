@@ -0,0 +1,42 @@
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Settings:
+    """Runtime settings, read from FUTUREATLAS_* environment variables"""
+
+    def __init__(self):
+        self.database_path = os.getenv("FUTUREATLAS_DB_PATH", os.path.join(BACKEND_DIR, "data", "futureatlas.db"))
+        # "readwrite" creates, migrates and seeds the database; "readonly" opens it with mode=ro for API workers
+        self.database_mode = os.getenv("FUTUREATLAS_DB_MODE", "readwrite")
+        self.pool_size = int(os.getenv("FUTUREATLAS_DB_POOL_SIZE", "5"))
+        self.pool_max_overflow = int(os.getenv("FUTUREATLAS_DB_POOL_MAX_OVERFLOW", "10"))
+        # Worker threads that async routes offload database reads and pandas/NumPy work to
+        self.db_threads = int(os.getenv("FUTUREATLAS_DB_THREADS", "8"))
+
+        # SQLite pragmas applied to every new connection
+        self.sqlite_journal_mode = os.getenv("FUTUREATLAS_SQLITE_JOURNAL_MODE", "WAL")
+        self.sqlite_synchronous = os.getenv("FUTUREATLAS_SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_mmap_size = int(os.getenv("FUTUREATLAS_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+        # Negative values are KiB, so the default is a 64 MiB page cache per connection
+        self.sqlite_cache_size = int(os.getenv("FUTUREATLAS_SQLITE_CACHE_SIZE", str(-64 * 1024)))
+        self.sqlite_temp_store = os.getenv("FUTUREATLAS_SQLITE_TEMP_STORE", "MEMORY")
+        self.sqlite_busy_timeout = int(os.getenv("FUTUREATLAS_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+        # Response cache: "memory" (per worker LRU) or "redis" (shared by every worker)
+        self.cache_backend = os.getenv("FUTUREATLAS_CACHE_BACKEND", "memory")
+        self.redis_url = os.getenv("FUTUREATLAS_REDIS_URL", "redis://localhost:6379/0")
+        self.cache_ttl = float(os.getenv("FUTUREATLAS_CACHE_TTL", "300"))
+        self.cache_maxsize = int(os.getenv("FUTUREATLAS_CACHE_MAXSIZE", "1024"))
+        # Live updates: "memory" (each worker ticks alone) or "redis" (one elected producer, every worker fans out)
+        self.broadcast_bus = os.getenv("FUTUREATLAS_BROADCAST_BUS", "memory")
+        # Required in X-Admin-Token by /api/admin/*, which are disabled when it is unset
+        self.admin_token = os.getenv("FUTUREATLAS_ADMIN_TOKEN")
+
+    @property
+    def read_only(self) -> bool:
+        return self.database_mode == "readonly"
+
+
+settings = Settings()
@@ -0,0 +1,14 @@
+import os
+import shutil
+import tempfile
+
+# Run the suite against a scratch copy so migrations and the WAL pragma never touch the committed database
+_source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "futureatlas.db")
+_scratch = tempfile.mkdtemp(prefix="futureatlas-test-")
+if "FUTUREATLAS_DB_PATH" not in os.environ:
+    os.environ["FUTUREATLAS_DB_PATH"] = os.path.join(_scratch, "futureatlas.db")
+    shutil.copyfile(_source, os.environ["FUTUREATLAS_DB_PATH"])
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_scratch, ignore_errors=True)
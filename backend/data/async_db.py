@@ -0,0 +1,57 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import sys
+import os
+# Ensure backend dir is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import settings
+from data.database import Database, db
+
+# Bounded pool for blocking work, separate from the threadpool Starlette uses for sync endpoints
+# and iterators, so a burst of heavy requests can't starve streaming responses (and vice versa)
+executor = ThreadPoolExecutor(max_workers=max(1, settings.db_threads), thread_name_prefix="futureatlas-db")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (SQLite query, pandas/NumPy work) on the bounded pool and await the result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def dataset_version():
+    """Current dataset version, or None while the database is still initialising (never blocks)"""
+    return db.data_version if db.ready else None
+
+
+class AsyncDatabase:
+    """Awaitable facade over ``Database``; every call runs on the bounded worker pool"""
+
+    def __init__(self, database: Database):
+        self.db = database
+
+    async def initialize(self):
+        await run_blocking(self.db.initialize)
+
+    async def cube(self):
+        # Only blocks (to initialise) the first time; afterwards this is an attribute read
+        if self.db.ready:
+            return self.db.cube
+        return await run_blocking(lambda: self.db.cube)
+
+    async def get_countries(self) -> List[Dict]:
+        return await run_blocking(self.db.get_countries)
+
+    async def get_country_data(self, iso: str):
+        return await run_blocking(self.db.get_country_data, iso)
+
+    async def get_year_data(self, year: int):
+        return await run_blocking(self.db.get_year_data, year)
+
+    async def get_all_countries_data(self):
+        return await run_blocking(self.db.get_all_countries_data)
+
+
+# Global async facade over the database instance
+adb = AsyncDatabase(db)
@@ -0,0 +1,101 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+from services.metrics import timed
+
+
+class DataCube:
+    """Columnar countries x years x metrics store held in memory.
+
+    Missing cells are NaN. ``iso_index`` maps an ISO3 code to its row and
+    ``year_offset`` maps a calendar year to its column.
+    """
+
+    METRICS = ('gdp', 'population', 'military', 'gsi')
+
+    def __init__(self, countries: List[Dict], year_start: int, values: np.ndarray):
+        self.countries = countries
+        self.isos = np.array([c['iso3'] for c in countries], dtype=object)
+        self.names = np.array([c['name'] for c in countries], dtype=object)
+        self.excluded = np.array([bool(c.get('exclude_from_leaderboard')) for c in countries], dtype=bool)
+        self.iso_index = {iso: i for i, iso in enumerate(self.isos)}
+        self.year_start = year_start
+        self.values = values
+        self.years = np.arange(year_start, year_start + values.shape[1], dtype=np.int64)
+        self.present = ~np.isnan(values).all(axis=2)
+        self.metric_index = {m: i for i, m in enumerate(self.METRICS)}
+
+    @classmethod
+    def from_rows(cls, countries: List[Dict], country_ids: Sequence[int], rows: Sequence[Tuple]) -> 'DataCube':
+        """Build a cube from ``(country_id, year, gdp, population, military, gsi)`` rows"""
+        n_metrics = len(cls.METRICS)
+        if len(rows) == 0:
+            return cls(countries, 0, np.empty((len(countries), 0, n_metrics)))
+
+        raw = np.array(rows, dtype=np.float64)
+        row_by_id = {cid: i for i, cid in enumerate(country_ids)}
+        rows_idx = np.array([row_by_id.get(int(cid), -1) for cid in raw[:, 0]], dtype=np.int64)
+        keep = rows_idx >= 0
+        raw, rows_idx = raw[keep], rows_idx[keep]
+
+        years = raw[:, 1].astype(np.int64)
+        year_start = int(years.min()) if len(years) else 0
+        n_years = int(years.max()) - year_start + 1 if len(years) else 0
+
+        values = np.full((len(countries), n_years, n_metrics), np.nan)
+        values[rows_idx, years - year_start] = raw[:, 2:2 + n_metrics]
+        return cls(countries, year_start, values)
+
+    def fingerprint(self) -> str:
+        """Content hash of the cube, stable across processes holding the same data"""
+        digest = hashlib.sha1()
+        digest.update('|'.join(self.isos).encode())
+        digest.update('|'.join(self.names).encode())
+        digest.update(self.excluded.tobytes())
+        digest.update(str(self.year_start).encode())
+        digest.update(np.ascontiguousarray(self.values).tobytes())
+        return digest.hexdigest()[:16]
+
+    def year_offset(self, year: int) -> Optional[int]:
+        offset = year - self.year_start
+        if offset < 0 or offset >= self.values.shape[1]:
+            return None
+        return offset
+
+    def year_slice(self, year: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row indices, values) for every country with data in ``year``"""
+        offset = self.year_offset(year)
+        if offset is None:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(self.METRICS)))
+        rows = np.flatnonzero(self.present[:, offset])
+        return rows, self.values[rows, offset]
+
+    @timed("dataframe_build")
+    def year_frame(self, year: int) -> pd.DataFrame:
+        """Year slice as a DataFrame with an ``iso`` column"""
+        rows, values = self.year_slice(year)
+        df = pd.DataFrame(values, columns=list(self.METRICS))
+        df.insert(0, 'iso', self.isos[rows])
+        return df
+
+    def country_series(self, iso: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return (years, values) for one country, or None if it has no data"""
+        row = self.iso_index.get(iso)
+        if row is None:
+            return None
+        mask = self.present[row]
+        if not mask.any():
+            return None
+        return self.years[mask], self.values[row, mask]
+
+    @timed("dataframe_build")
+    def country_frame(self, iso: str) -> Optional[pd.DataFrame]:
+        """Country series in the same shape as ``Database.get_country_data``"""
+        series = self.country_series(iso)
+        if series is None:
+            return None
+        years, values = series
+        df = pd.DataFrame(values, columns=list(self.METRICS))
+        df.insert(0, 'year', years)
+        return df
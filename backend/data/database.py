@@ -2,29 +2,111 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import sys
-import os
+import threading
 # Ensure backend dir is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Settings, settings as default_settings
+from data.engine import create_sqlite_engine
+from services.metrics import timed
+
+
+# Years generated when seeding an empty database
+SEED_YEARS = np.arange(2000, 2051)
 
 
 class Database:
-    def __init__(self):
-        self.db_path = os.path.join(os.path.dirname(__file__), "futureatlas.db")
-        self.engine = create_engine(f"sqlite:///{self.db_path}", connect_args={"check_same_thread": False})
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or default_settings
+        self.db_path = self.settings.database_path
+        self.engine = create_sqlite_engine(self.settings)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
-        # Create tables
-        from data.models import Base
-        Base.metadata.create_all(bind=self.engine)
-        
-        # Initialize/Check data
-        self._initialize_data()
+        # Tables, seed data and the in-memory cube are set up by initialize(), either from the
+        # app lifespan in a background thread or lazily on first use
+        self._cube = None
+        self._data_version = None
+        self._ready = threading.Event()
+        self._init_lock = threading.Lock()
+        self.init_error: Optional[Exception] = None
+    
+    def initialize(self):
+        """Create tables, seed an empty database and load the cube. Runs once; safe from any thread."""
+        if self._ready.is_set():
+            return
+        with self._init_lock:
+            if self._ready.is_set():
+                return
+            try:
+                if not self.settings.read_only:
+                    from data.models import Base
+                    Base.metadata.create_all(bind=self.engine)
+                    ensure_indexes(self.engine)
+                    self._initialize_data()
+                self.refresh_cube()
+            except Exception as e:
+                self.init_error = e
+                raise
+            self.init_error = None
+            self._ready.set()
+    
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+    
+    @property
+    def initializing(self) -> bool:
+        return self._init_lock.locked() and not self._ready.is_set()
+    
+    @property
+    def status(self) -> str:
+        """'ready', 'failed' (last initialize() raised) or 'starting'"""
+        if self._ready.is_set():
+            return "ready"
+        if self.init_error is not None and not self._init_lock.locked():
+            return "failed"
+        return "starting"
+    
+    @property
+    def cube(self):
+        """In-memory cube served to the read-heavy routes"""
+        self.initialize()
+        return self._cube
+    
+    @property
+    def data_version(self) -> str:
+        self.initialize()
+        return self._data_version
+    
+    @timed("cube_build")
+    def refresh_cube(self):
+        """Reload the in-memory cube from SQLite. Call after any write to yearly_data."""
+        from data.models import Country, YearData
+        from data.cube import DataCube
+        session = self.SessionLocal()
+        try:
+            countries = session.query(Country).order_by(Country.id).all()
+            meta = [
+                {
+                    "iso": c.iso,
+                    "iso3": c.iso3,
+                    "name": c.name,
+                    "region": c.region,
+                    "exclude_from_leaderboard": c.exclude_from_leaderboard
+                }
+                for c in countries
+            ]
+            rows = self._fetch_yearly()
+            self._cube = DataCube.from_rows(meta, [c.id for c in countries], rows)
+            self._data_version = self._cube.fingerprint()
+        finally:
+            session.close()
     
+    @timed("db_fetch")
     def get_countries(self) -> List[Dict]:
         from data.models import Country
+        self.initialize()
         session = self.SessionLocal()
         try:
             countries = session.query(Country).all()
@@ -41,57 +123,144 @@ class Database:
         finally:
             session.close()
             
-    def get_country_data(self, iso: str) -> Optional[pd.DataFrame]:
+    # Column order of the arrays returned by _fetch_yearly
+    YEARLY_COLUMNS = ('country_id', 'year', 'gdp', 'population', 'military', 'gsi')
+
+    @classmethod
+    def yearly_query(cls):
+        """Every yearly_data row"""
+        from sqlalchemy import select
+        from data.models import YearData
+        return select(*[getattr(YearData, c) for c in cls.YEARLY_COLUMNS])
+
+    @classmethod
+    def country_query(cls, iso: str):
+        """One country's rows ordered by year (served by uq_yearly_data_country_year)"""
         from data.models import Country, YearData
-        session = self.SessionLocal()
-        try:
-            country = session.query(Country).filter(Country.iso3 == iso.lower()).first()
-            if not country:
-                return None
-            
-            data = session.query(YearData).filter(YearData.country_id == country.id).order_by(YearData.year).all()
-            
-            if not data:
-                return None
+        return (cls.yearly_query()
+                .join(Country, Country.id == YearData.country_id)
+                .where(Country.iso3 == iso)
+                .order_by(YearData.year))
 
-            return pd.DataFrame([{
-                'year': d.year,
-                'gdp': d.gdp,
-                'population': d.population,
-                'military': d.military,
-                'gsi': d.gsi
-            } for d in data])
-        finally:
-            session.close()
+    @classmethod
+    def year_query(cls, year: int):
+        """Every country's row for one year (covered by ix_yearly_data_year_country)"""
+        from data.models import YearData
+        return cls.yearly_query().where(YearData.year == year).order_by(YearData.country_id)
+
+    # Rows pulled from the cursor per fetchmany call in _fetch_yearly
+    FETCH_BATCH = 4096
+
+    @timed("db_fetch")
+    def _fetch_yearly(self, query=None) -> np.ndarray:
+        """yearly_data as a float64 (rows x YEARLY_COLUMNS) array, without building ORM objects
+        
+        The array is allocated once from a row count (column-major, so each column is contiguous)
+        and filled column by column from fetchmany batches; NULLs become NaN.
+        """
+        from sqlalchemy import select, func
+        if query is None:
+            query = self.yearly_query()
+        with self.engine.connect() as conn:
+            n_rows = conn.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar_one()
+            block = np.empty((n_rows, len(self.YEARLY_COLUMNS)), dtype=np.float64, order='F')
+            filled = 0
+            result = conn.execute(query)
+            while True:
+                batch = result.fetchmany(self.FETCH_BATCH)
+                if not batch:
+                    break
+                end = filled + len(batch)
+                if end > len(block):
+                    # Rows were added between the count and the read
+                    block = np.concatenate([block, np.empty((end - len(block), block.shape[1]))]).copy(order='F')
+                for i, values in enumerate(zip(*batch)):
+                    block[filled:end, i] = values
+                filled = end
+        return block[:filled]
+
+    @staticmethod
+    @timed("dataframe_build")
+    def _yearly_frame(block: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            'year': block[:, 1].astype(np.int64),
+            'gdp': block[:, 2],
+            'population': block[:, 3],
+            'military': block[:, 4],
+            'gsi': block[:, 5]
+        })
+
+    def get_country_data(self, iso: str) -> Optional[pd.DataFrame]:
+        self.initialize()
+        block = self._fetch_yearly(self.country_query(iso.lower()))
+        if len(block) == 0:
+            return None
+        return self._yearly_frame(block)
+
+    def get_year_data(self, year: int) -> pd.DataFrame:
+        """All countries' values for one year, with an iso column"""
+        from sqlalchemy import select
+        from data.models import Country
+        self.initialize()
+        with self.engine.connect() as conn:
+            iso_by_id = dict(conn.execute(select(Country.id, Country.iso3)).fetchall())
+        block = self._fetch_yearly(self.year_query(year))
+        df = self._yearly_frame(block)
+        df.insert(0, 'iso', [iso_by_id.get(int(cid)) for cid in block[:, 0]])
+        return df
 
     def get_all_countries_data(self) -> Dict[str, pd.DataFrame]:
+        from sqlalchemy import select
+        from data.models import Country
+        self.initialize()
+        with self.engine.connect() as conn:
+            iso_by_id = dict(conn.execute(select(Country.id, Country.iso3)).fetchall())
+        
+        # Sort by (country, year) once and split into contiguous per-country blocks
+        block = self._fetch_yearly()
+        block = block[np.lexsort((block[:, 1], block[:, 0]))]
+        ids = block[:, 0].astype(np.int64)
+        boundaries = np.flatnonzero(np.diff(ids)) + 1
+        group_ids = ids[np.concatenate(([0], boundaries))] if len(ids) else []
+        
+        all_data = {}
+        for country_id, group in zip(group_ids, np.split(block, boundaries)):
+            if country_id in iso_by_id:
+                all_data[iso_by_id[country_id]] = self._yearly_frame(group)
+        return all_data
+
+    EXPORT_METRICS = ('gdp', 'population', 'military', 'gsi')
+
+    def export_query(self, metrics: List[str], year_from: Optional[int] = None, year_to: Optional[int] = None,
+                     regions: Optional[List[str]] = None, isos: Optional[List[str]] = None):
+        """Core select of iso/name/region/year plus the requested metrics, ordered by country and year"""
+        from sqlalchemy import select, func
         from data.models import Country, YearData
-        session = self.SessionLocal()
-        try:
-            countries = session.query(Country).all()
-            all_data = {}
-            
-            # Fetch all data efficiently
-            rows = session.query(YearData).all()
-            
-            from collections import defaultdict
-            data_by_id = defaultdict(list)
-            for row in rows:
-                data_by_id[row.country_id].append({
-                    'year': row.year,
-                    'gdp': row.gdp,
-                    'population': row.population,
-                    'military': row.military,
-                    'gsi': row.gsi
-                })
-                
-            for country in countries:
-                if country.id in data_by_id:
-                    all_data[country.iso3] = pd.DataFrame(data_by_id[country.id])
-            
-            return all_data
-        finally:
-            session.close()
+        
+        query = select(
+            Country.iso3.label('iso'), Country.name, Country.region, YearData.year,
+            *[getattr(YearData, m) for m in metrics]
+        ).join(Country, Country.id == YearData.country_id)
+        
+        if year_from is not None:
+            query = query.where(YearData.year >= year_from)
+        if year_to is not None:
+            query = query.where(YearData.year <= year_to)
+        if regions:
+            query = query.where(func.lower(Country.region).in_([r.lower() for r in regions]))
+        if isos:
+            query = query.where(Country.iso3.in_([i.lower() for i in isos]))
+        
+        return query.order_by(Country.iso3, YearData.year)
+
+    def stream_rows(self, query, batch_size: int = 2000):
+        """Yield (column names, row batch) pairs from a server-side cursor"""
+        self.initialize()
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            columns = list(result.keys())
+            for batch in result.partitions():
+                yield columns, batch
 
     def _initialize_data(self):
         """Initialize database with data if empty"""
@@ -319,127 +488,48 @@ class Database:
                 {"iso": "glp", "iso3": "glp", "name": "Guadeloupe", "region": "North America", "exclude_from_leaderboard": True},
             ]
             
-            # Temporary dict to hold data for GSI calculation
-            temp_data = {}
-            
-            # Generate synthetic historical data (2000-2023) and forecast (2024-2050)
-            for country in countries_list:
-                iso = country['iso3']
-                name = country['name']
-                
-                # Base values (simplified)
-                base_gdp = self._get_base_gdp(name)
-                base_pop = self._get_base_pop(name)
-                base_mil = self._get_base_mil(name)
-                
-                years = list(range(2000, 2051))
-                data = []
+            try:
+                panel = self._synthetic_panel(countries_list, SEED_YEARS)
                 
-                for year in years:
-                    if year <= 2023:
-                        # Historical trend
-                        growth_factor = 1 + (year - 2000) * 0.02
-                        gdp = base_gdp * growth_factor
-                        pop = base_pop * (1 + (year - 2000) * 0.01)
-                        mil = base_mil * growth_factor
-                    else:
-                        # Forecast
-                        forecast_years = year - 2023
-                        if name == "China":
-                            # China slowing down but still growing
-                            gdp = base_gdp * (1.04 ** forecast_years)
-                            pop = base_pop * (0.998 ** forecast_years)
-                            mil = gdp * 0.02
-                        elif name == "India":
-                            # High growth
-                            gdp = base_gdp * (1.06 ** forecast_years)
-                            pop = base_pop * (1.008 ** forecast_years)
-                            mil = gdp * 0.025
-                        elif name == "United States":
-                            gdp = base_gdp * (1.02 ** forecast_years)
-                            pop = base_pop * (1.004 ** forecast_years)
-                            mil = gdp * 0.032
-                        elif name == "Russia":
-                            gdp = base_gdp * (1.015 ** forecast_years)
-                            pop = base_pop * (0.995 ** forecast_years)
-                            mil = base_mil * (1.02 ** forecast_years)
-                        else:
-                            gdp = base_gdp * (1.025 ** forecast_years)
-                            pop = base_pop * (1.005 ** forecast_years)
-                            mil = gdp * 0.02
-                    
-                    data.append({
-                        'year': year,
-                        'gdp': gdp,
-                        'population': pop,
-                        'military': mil
-                    })
+                # GSI for every year in one vectorized pass
+                from services.gsi_calculator import GSICalculator, PANEL_METRICS
+                gsi, _ = GSICalculator().calculate_gsi_panel(panel)
                 
-                temp_data[iso] = pd.DataFrame(data)
-
-            # Pre-calculate GSI
-            try:
-                from services.gsi_calculator import GSICalculator
-                calculator = GSICalculator()
+                print("Populating SQLite database...")
+                from sqlalchemy import insert
                 
-                # Combine all data for batch processing
-                all_frames = []
-                for iso, df in temp_data.items():
-                    df_copy = df.copy()
-                    df_copy['iso'] = iso
-                    all_frames.append(df_copy)
+                # IDs are preassigned so no per-country flush is needed to link rows
+                country_ids = np.arange(1, len(countries_list) + 1)
+                session.execute(insert(Country.__table__), [
+                    {
+                        "id": int(country_id),
+                        "iso": meta['iso'],
+                        "iso3": meta['iso3'],
+                        "name": meta['name'],
+                        "region": meta['region'],
+                        "exclude_from_leaderboard": meta.get('exclude_from_leaderboard', False)
+                    }
+                    for country_id, meta in zip(country_ids, countries_list)
+                ])
                 
-                if all_frames:
-                    combined_df = pd.concat(all_frames)
-                    processed_frames = []
-                    unique_years = sorted(combined_df['year'].unique())
-                    
-                    for year in unique_years:
-                        year_df = combined_df[combined_df['year'] == year].copy()
-                        if not year_df.empty:
-                            year_df = calculator.calculate_gsi(year_df)
-                            processed_frames.append(year_df)
-                    
-                    if processed_frames:
-                        final_df = pd.concat(processed_frames)
-                        
-                        # Populate Database
-                        print("Populating SQLite database...")
-                        
-                        # Cache countries to get IDs
-                        country_map = {}
-                        
-                        for country_meta in countries_list:
-                            db_country = Country(
-                                iso=country_meta['iso'],
-                                iso3=country_meta['iso3'],
-                                name=country_meta['name'],
-                                region=country_meta['region'],
-                                exclude_from_leaderboard=country_meta.get('exclude_from_leaderboard', False)
-                            )
-                            session.add(db_country)
-                            session.flush()
-                            country_map[country_meta['iso3']] = db_country.id
-                        
-                        # Insert bulk data
-                        # We iterate over the final_df
-                        bulk_data = []
-                        for _, row in final_df.iterrows():
-                            # Row has: year, gdp, population, military, year, iso, etc + gsi
-                            c_iso = row['iso']
-                            if c_iso in country_map:
-                                bulk_data.append(YearData(
-                                    country_id=country_map[c_iso],
-                                    year=int(row['year']),
-                                    gdp=float(row['gdp']),
-                                    population=float(row['population']),
-                                    military=float(row['military']),
-                                    gsi=float(row.get('gsi', 0))
-                                ))
-                        
-                        session.bulk_save_objects(bulk_data)
-                        session.commit()
-                        print(f"Successfully inserted {len(bulk_data)} records.")
+                # Year-major rows: (year, country) flattened in C order
+                n_years, n_countries = gsi.shape
+                metric_columns = {m: panel[:, :, i].ravel().tolist() for i, m in enumerate(PANEL_METRICS)}
+                ids = range(1, n_years * n_countries + 1)
+                year_rows = [
+                    {"id": row_id, "country_id": country_id, "year": year,
+                     "gdp": gdp, "population": population, "military": military, "gsi": g}
+                    for row_id, country_id, year, gdp, population, military, g in zip(
+                        ids,
+                        np.tile(country_ids, n_years).tolist(),
+                        np.repeat(SEED_YEARS, n_countries).tolist(),
+                        metric_columns['gdp'], metric_columns['population'], metric_columns['military'],
+                        gsi.ravel().tolist()
+                    )
+                ]
+                session.execute(insert(YearData.__table__), year_rows)
+                session.commit()
+                print(f"Successfully inserted {len(year_rows)} records.")
                         
             except Exception as e:
                 print(f"Error calculating/inserting GSI: {e}")
@@ -453,6 +543,50 @@ class Database:
         finally:
             session.close()
 
+    # Forecast-period growth: (GDP rate, population rate, military share of GDP, military rate).
+    # Countries with a military share derive military spend from GDP; otherwise it compounds at its own rate.
+    FORECAST_GROWTH = {
+        "China": (1.04, 0.998, 0.02, None),
+        "India": (1.06, 1.008, 0.025, None),
+        "United States": (1.02, 1.004, 0.032, None),
+        "Russia": (1.015, 0.995, None, 1.02),
+    }
+    DEFAULT_FORECAST_GROWTH = (1.025, 1.005, 0.02, None)
+
+    def _synthetic_panel(self, countries_list: List[Dict], years: np.ndarray) -> np.ndarray:
+        """Synthetic (year, country, metric) panel: linear history to 2023, compound growth after"""
+        names = [c['name'] for c in countries_list]
+        base_gdp = np.array([self._get_base_gdp(n) for n in names])
+        base_pop = np.array([self._get_base_pop(n) for n in names])
+        base_mil = np.array([self._get_base_mil(n) for n in names])
+        growth = [self.FORECAST_GROWTH.get(n, self.DEFAULT_FORECAST_GROWTH) for n in names]
+        gdp_rate = np.array([g[0] for g in growth])
+        pop_rate = np.array([g[1] for g in growth])
+        mil_share = np.array([np.nan if g[2] is None else g[2] for g in growth])
+        mil_rate = np.array([np.nan if g[3] is None else g[3] for g in growth])
+        
+        # (years, 1) against (countries,) broadcasts to (years, countries)
+        elapsed = (years - 2000)[:, None].astype(np.float64)
+        forecast_years = (years - 2023)[:, None].astype(np.float64)
+        historical = (years <= 2023)[:, None]
+        
+        # Historical trend
+        growth_factor = 1 + elapsed * 0.02
+        hist_gdp = base_gdp * growth_factor
+        hist_pop = base_pop * (1 + elapsed * 0.01)
+        hist_mil = base_mil * growth_factor
+        
+        # Forecast
+        fc_gdp = base_gdp * gdp_rate ** forecast_years
+        fc_pop = base_pop * pop_rate ** forecast_years
+        fc_mil = np.where(np.isnan(mil_share), base_mil * mil_rate ** forecast_years, fc_gdp * mil_share)
+        
+        panel = np.empty((len(years), len(names), 3))
+        from services.gsi_calculator import PANEL_METRICS
+        for metric, hist, fc in (('gdp', hist_gdp, fc_gdp), ('population', hist_pop, fc_pop), ('military', hist_mil, fc_mil)):
+            panel[:, :, PANEL_METRICS.index(metric)] = np.where(historical, hist, fc)
+        return panel
+
     def _get_base_gdp(self, name: str) -> float:
         """Get base GDP in billions USD"""
         base_values = {
@@ -540,5 +674,15 @@ class Database:
         }
         return base_values.get(name, 2)
 
-# Global database instance
+def ensure_indexes(engine):
+    """Create model indexes missing from an existing database file (create_all skips existing tables)"""
+    from data.models import Base
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"Could not create index {index.name}: {e}")
+
+# Global database instance; cheap to construct, call db.initialize() (or touch db.cube) to load it
 db = Database()
@@ -0,0 +1,62 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, StaticPool
+import sys
+import os
+# Ensure backend dir is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Settings
+
+
+def sqlite_pragmas(settings: Settings) -> list:
+    """PRAGMA statements run on every new connection"""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size = {settings.sqlite_cache_size}",
+        f"PRAGMA temp_store = {settings.sqlite_temp_store}",
+    ]
+    if not settings.read_only:
+        # journal_mode is persisted in the file and needs write access to change
+        pragmas.insert(0, f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        pragmas.insert(1, f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+    return pragmas
+
+
+def create_sqlite_engine(settings: Settings) -> Engine:
+    """SQLite engine with tuned pragmas and a pool suited to the database kind.
+    
+    In-memory databases share one connection (StaticPool); files use a QueuePool,
+    opened with ``mode=ro`` when ``settings.read_only`` is set.
+    """
+    path = settings.database_path
+    connect_args = {"check_same_thread": False}
+    
+    if path == ":memory:":
+        engine = create_engine("sqlite://", connect_args=connect_args, poolclass=StaticPool)
+    else:
+        if settings.read_only:
+            url = f"sqlite:///file:{path}?mode=ro&uri=true"
+        else:
+            url = f"sqlite:///{path}"
+        engine = create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=settings.pool_size,
+            max_overflow=settings.pool_max_overflow,
+            pool_pre_ping=False,
+        )
+    
+    pragmas = sqlite_pragmas(settings)
+    
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    return engine
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -17,6 +17,12 @@ class Country(Base):
 
 class YearData(Base):
     __tablename__ = 'yearly_data'
+    __table_args__ = (
+        # One row per country and year; serves per-country series ordered by year
+        Index('uq_yearly_data_country_year', 'country_id', 'year', unique=True),
+        # Covers whole-year slices (leaderboard) without touching the table
+        Index('ix_yearly_data_year_country', 'year', 'country_id', 'gdp', 'population', 'military', 'gsi'),
+    )
     
     id = Column(Integer, primary_key=True)
     country_id = Column(Integer, ForeignKey('countries.id'))
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from pydantic import BaseModel
 import uvicorn
@@ -11,12 +12,55 @@ import os
 # Add backend directory to path
 sys.path.append(os.path.dirname(__file__))
 
-from api.routes import timeseries, countries, leaderboard, scenario, insights
+from api.routes import timeseries, countries, leaderboard, scenario, insights, export, admin
+from data.database import db
+from services.fast_json import FastJSONResponse
+from data.async_db import adb, run_blocking, dataset_version
+from services import single_flight, metrics
+from services.broadcast_bus import create_bus
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bind first, then create/seed the database and load the cube off the event loop
+    tasks = [
+        asyncio.create_task(initialize_store()),
+        asyncio.create_task(supervise("Live update relay", lambda: manager.relay(bus))),
+        asyncio.create_task(periodic_updates()),
+        asyncio.create_task(metrics.monitor_event_loop()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await bus.close()
+
+async def supervise(name: str, run, delay: float = 0.5, max_delay: float = 30.0):
+    """Run a background coroutine forever: log whenever it stops or fails and restart it with backoff"""
+    initial = delay
+    while True:
+        started = time.perf_counter()
+        try:
+            await run()
+            print(f"{name} stopped; restarting in {delay:.1f}s")
+        except Exception as e:
+            print(f"{name} failed: {e!r}; restarting in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        # Back off only while it keeps failing straight away
+        delay = initial if time.perf_counter() - started > max_delay else min(delay * 2, max_delay)
+
+async def initialize_store():
+    started = time.perf_counter()
+    try:
+        await adb.initialize()
+        print(f"Database ready in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        print(f"Error initializing database: {e}")
 
 app = FastAPI(
     title="FutureAtlas 2050 API",
     description="API for predicting and visualizing future global superpowers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -28,12 +72,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def require_ready(request, call_next):
+    # While the background initialisation runs, answer API calls with 503 instead of blocking the loop
+    if db.initializing and request.url.path.startswith("/api") and request.url.path != "/api/health":
+        return JSONResponse(status_code=503, content={"detail": "Service is starting"}, headers={"Retry-After": "1"})
+    return await call_next(request)
+
+def _route_template(request) -> str:
+    """Matched route template with its router prefix (/api/timeseries/{iso}), keeping label cardinality bounded"""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # The matched route is the included router's own object, whose path is relative to API_PREFIX
+    if id(route) in API_ROUTE_IDS:
+        return API_PREFIX + route.path
+    return route.path
+
+@app.middleware("http")
+async def record_latency(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        path = _route_template(request)
+        metrics.http_request_seconds.observe(time.perf_counter() - start, route=path, method=request.method)
+        metrics.http_requests_total.inc(route=path, method=request.method, status=status)
+
 # Include routers
-app.include_router(countries.router, prefix="/api", tags=["countries"])
-app.include_router(timeseries.router, prefix="/api", tags=["timeseries"])
-app.include_router(leaderboard.router, prefix="/api", tags=["leaderboard"])
-app.include_router(scenario.router, prefix="/api", tags=["scenario"])
-app.include_router(insights.router, prefix="/api", tags=["insights"])
+API_PREFIX = "/api"
+API_ROUTERS = [
+    (countries.router, "countries"),
+    (timeseries.router, "timeseries"),
+    (leaderboard.router, "leaderboard"),
+    (scenario.router, "scenario"),
+    (insights.router, "insights"),
+    (export.router, "export"),
+    (admin.router, "admin"),
+]
+for router, tag in API_ROUTERS:
+    app.include_router(router, prefix=API_PREFIX, tags=[tag])
+API_ROUTE_IDS = {id(route) for router, _ in API_ROUTERS for route in router.routes}
 
 @app.get("/")
 async def root():
@@ -41,51 +123,124 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "healthy"}
+    """Readiness: 200 once the database and cube are loaded, 503 while starting or after a failed start"""
+    status = db.status
+    if status == "ready":
+        return {"status": "healthy", "ready": True}
+    content = {"status": status, "ready": False}
+    if db.init_error is not None:
+        content["error"] = str(db.init_error)
+    return JSONResponse(status_code=503, content=content)
 
 # WebSocket Connection Manager
 from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
 import random
 import json
+import time
+from services.live_protocol import ClientState, YearStream, PROTOCOL_DELTA, encode
+from services.leaderboard_snapshots import LEADERBOARD_YEARS
+
+UPDATE_INTERVAL = 2.0  # Seconds between live updates
+SEND_TIMEOUT = 1.0  # Sockets that can't take a frame within this are evicted
 
 class ConnectionManager:
     def __init__(self):
+        # Sockets switching to the same year at once share one entries build
+        self.year_flight = single_flight.flight("ws_year", dataset_version)
         self.active_connections: List[WebSocket] = []
         self.connection_years: dict[WebSocket, int] = {}
+        self.client_states: dict[WebSocket, ClientState] = {}
+        self.streams: dict[int, YearStream] = {}
         self.is_running = False
+        self.stats = {
+            "ticks": 0,
+            "ticks_produced": 0,
+            "last_tick_seconds": 0.0,
+            "max_tick_seconds": 0.0,
+            "last_fanout_seconds": 0.0,
+            "max_fanout_seconds": 0.0,
+            "frames_built": 0,
+            "frames_sent": 0,
+            "evicted": 0,
+        }
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
         self.connection_years[websocket] = 2050  # Default year
+        self.client_states[websocket] = ClientState()
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
         if websocket in self.connection_years:
-            del self.connection_years[websocket]
+            self._release_year(self.connection_years.pop(websocket))
+        self.client_states.pop(websocket, None)
+
+    def _release_year(self, year: int):
+        """Drop a year's stream (and the keyframe it holds) once nobody subscribes to it"""
+        if year not in self.connection_years.values():
+            self.streams.pop(year, None)
+
+    async def handle_message(self, websocket: WebSocket, message: dict):
+        """Apply protocol negotiation, year changes and resync requests from a client"""
+        state = self.client_states.get(websocket)
+        if state is None:
+            return
+        state.negotiate(message)
+        if "year" in message:
+            year = int(message["year"])
+            # Only years with a leaderboard get a stream; anything else keeps the current subscription
+            if year in LEADERBOARD_YEARS:
+                await self.set_year(websocket, year)
+        elif message.get("resync") or "protocol" in message:
+            state.last_seq = None
+            await self.set_year(websocket, self.connection_years.get(websocket, 2050))
 
     async def set_year(self, websocket: WebSocket, year: int):
+        previous = self.connection_years.get(websocket)
         self.connection_years[websocket] = year
+        if previous is not None and previous != year:
+            self._release_year(previous)
+        state = self.client_states.get(websocket)
         # Immediately send update for the new year
-        await self.send_update(websocket, year)
+        if state is not None and state.protocol == PROTOCOL_DELTA:
+            stream = self._stream(year)
+            if stream.entries is None:
+                entries = await self.year_flight.do(year, run_blocking, self.build_entries, year)
+                if entries is None:
+                    return
+                if stream.entries is None:
+                    # Another socket may have started the stream while this one waited
+                    stream.advance(entries)
+            frame = stream.keyframe(state.encoding)
+            state.last_seq = stream.seq
+        else:
+            entries = await self.year_flight.do(year, run_blocking, self.build_entries, year)
+            frame = encode(entries) if entries is not None else None
+        if frame is not None and not await self._send(websocket, frame):
+            await self._evict(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        await self._fan_out(list(self.active_connections), message)
 
-    async def send_update(self, websocket: WebSocket, year: int):
+    def build_entries(self, year: int) -> Optional[List[dict]]:
+        """Jittered leaderboard for a year, built once per tick for all its subscribers"""
         # Simulate live data by fetching real data and adding noise
         # This prevents circular imports by importing inside the method
-        from api.routes.leaderboard import get_leaderboard
+        from api.routes.leaderboard import snapshots
+        
+        if not db.ready:
+            # Nothing to send until the background initialisation has loaded the cube
+            return None
         
         try:
             # Get the base data
-            base_data = await get_leaderboard(year=year)
+            base_data = snapshots.get(year).entries
             
             # Add "live" fluctuations
             updated_data = []
@@ -114,12 +269,166 @@ class ConnectionManager:
             # Update ranks
             for i, country in enumerate(updated_data):
                 country['rank'] = i + 1
-                
-            await websocket.send_json(updated_data)
+            
+            self.stats["frames_built"] += 1
+            return updated_data
         except Exception as e:
             print(f"Error generating update: {e}")
+            return None
+
+    def build_many(self, years: List[int]) -> dict:
+        """build_entries for several years in one call, so a tick costs a single hop to the worker pool"""
+        return {year: self.build_entries(year) for year in years}
+
+    def subscribed_years(self) -> List[int]:
+        return sorted(set(self.connection_years.values()))
+
+    async def produce(self, bus):
+        """Producer side of a tick: build every year any worker subscribes to, once, and publish it"""
+        tick_start = time.perf_counter()
+        years = sorted(await bus.subscribed_years())
+        built = await run_blocking(self.build_many, years) if years else {}
+        await bus.publish({year: entries for year, entries in built.items() if entries is not None})
+        self._record("tick", time.perf_counter() - tick_start)
+        self.stats["ticks_produced"] += 1
+
+    async def relay(self, bus):
+        """Fan out every tick published on the bus (by this worker or the elected producer elsewhere)"""
+        async for built in bus.ticks():
+            try:
+                await self.fan_out_tick(built)
+            except Exception as e:
+                print(f"Error fanning out update: {e}")
+
+    async def fan_out_tick(self, built: dict):
+        """Send a tick's entries (year -> leaderboard) to the sockets subscribed to each year"""
+        fanout_start = time.perf_counter()
+        
+        # Group connections by year so each frame is encoded once
+        year_groups: dict[int, List[WebSocket]] = {}
+        for ws, year in list(self.connection_years.items()):
+            year_groups.setdefault(year, []).append(ws)
+        
+        sends = []
+        for year, websockets in year_groups.items():
+            entries = built.get(year)
+            if entries is None:
+                continue
+            stream = self._stream(year)
+            stream.advance(entries)
+            full_frame = None
+            frames = []
+            for ws in websockets:
+                state = self.client_states.get(ws)
+                if state is not None and state.protocol == PROTOCOL_DELTA:
+                    frames.append(stream.frame_for(state))
+                else:
+                    # Protocol 1: same full frame (encoded once) for every legacy client
+                    if full_frame is None:
+                        full_frame = encode(entries)
+                    frames.append(full_frame)
+            sends.append(self._fan_out(websockets, frames))
+        
+        await asyncio.gather(*sends)
+        
+        self._record("fanout", time.perf_counter() - fanout_start)
+        self.stats["ticks"] += 1
+
+    async def _fan_out(self, websockets: List[WebSocket], frames):
+        if isinstance(frames, (str, bytes)):
+            frames = [frames] * len(websockets)
+        results = await asyncio.gather(*(self._send(ws, frame) for ws, frame in zip(websockets, frames)))
+        for ws, ok in zip(websockets, results):
+            if ok:
+                self.stats["frames_sent"] += 1
+            else:
+                await self._evict(ws)
+
+    def _stream(self, year: int) -> YearStream:
+        if year not in self.streams:
+            self.streams[year] = YearStream(year)
+        return self.streams[year]
+
+    async def _send(self, websocket: WebSocket, frame) -> bool:
+        try:
+            if isinstance(frame, bytes):
+                await asyncio.wait_for(websocket.send_bytes(frame), timeout=SEND_TIMEOUT)
+            else:
+                await asyncio.wait_for(websocket.send_text(frame), timeout=SEND_TIMEOUT)
+            return True
+        except Exception:
+            # Slow, closed or broken connection
+            return False
+
+    async def _evict(self, websocket: WebSocket):
+        if websocket not in self.connection_years:
+            return
+        self.disconnect(websocket)
+        self.stats["evicted"] += 1
+        try:
+            await asyncio.wait_for(websocket.close(code=1008), timeout=SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def _record(self, name: str, seconds: float):
+        metrics.stage_seconds.observe(seconds, stage=f"ws_{name}")
+        self.stats[f"last_{name}_seconds"] = seconds
+        self.stats[f"max_{name}_seconds"] = max(self.stats[f"max_{name}_seconds"], seconds)
 
 manager = ConnectionManager()
+# Carries each tick from the elected producer to every worker's fan-out
+bus = create_bus(tick_interval=UPDATE_INTERVAL)
+
+@app.get("/api/live/stats")
+async def live_stats():
+    """Live update broadcaster statistics"""
+    years = {}
+    for year in manager.connection_years.values():
+        years[year] = years.get(year, 0) + 1
+    return {"connections": len(manager.active_connections), "connections_by_year": years, **manager.stats,
+            "bus": bus.info()}
+
+def _ws_connections():
+    years = {}
+    for year in manager.connection_years.values():
+        years[year] = years.get(year, 0) + 1
+    return [({"year": year}, count) for year, count in years.items()]
+
+def _response_cache_requests():
+    from api.cache import response_cache
+    for endpoint, hits in response_cache.hits.items():
+        yield {"endpoint": endpoint, "result": "hit"}, hits
+    for endpoint, misses in response_cache.misses.items():
+        yield {"endpoint": endpoint, "result": "miss"}, misses
+
+def _single_flight_calls():
+    for name, group in single_flight.registry.items():
+        yield {"group": name, "result": "executed"}, group.executed
+        yield {"group": name, "result": "coalesced"}, group.coalesced
+
+metrics.registry.collected("futureatlas_ws_connections", "gauge", "Open WebSocket connections by subscribed year", _ws_connections)
+metrics.registry.collected("futureatlas_ws_frames_sent_total", "counter", "WebSocket frames delivered",
+                           lambda: [({}, manager.stats["frames_sent"])])
+metrics.registry.collected("futureatlas_ws_evicted_total", "counter", "WebSocket clients evicted as slow or broken",
+                           lambda: [({}, manager.stats["evicted"])])
+metrics.registry.collected("futureatlas_response_cache_requests_total", "counter",
+                           "Response cache lookups by endpoint and result (hit rate = hit / (hit + miss))", _response_cache_requests)
+metrics.registry.collected("futureatlas_single_flight_calls_total", "counter",
+                           "Single-flight calls that ran the computation or awaited another caller's", _single_flight_calls)
+metrics.registry.collected("futureatlas_ws_producer", "gauge", "1 while this worker builds the live frames for every worker",
+                           lambda: [({"bus": bus.name}, 1 if bus.is_producer else 0)])
+metrics.registry.collected("futureatlas_ready", "gauge", "1 once the database and cube are loaded",
+                           lambda: [({}, 1 if db.ready else 0)])
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of stage timings, request latency, caches, WebSocket and event-loop lag"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/coalescing/stats")
+async def coalescing_stats():
+    """Calls, executions and coalesced (shared) requests per single-flight group"""
+    return single_flight.stats()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -129,42 +438,29 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             try:
                 message = json.loads(data)
-                if "year" in message:
-                    await manager.set_year(websocket, int(message["year"]))
+                if isinstance(message, dict):
+                    await manager.handle_message(websocket, message)
             except:
                 pass
     except WebSocketDisconnect:
         manager.disconnect(websocket)
+    except RuntimeError:
+        # Socket was closed by an eviction
+        manager.disconnect(websocket)
 
-# Background task for periodic updates
-@app.on_event("startup")
-async def startup_event():
-    asyncio.create_task(periodic_updates())
-
+# Background task for periodic updates (started by the lifespan).
+# Every worker announces its subscribed years; only the elected producer builds and publishes the tick.
 async def periodic_updates():
     while True:
-        await asyncio.sleep(2)  # Update every 2 seconds
-        
-        # Group connections by year to optimize fetching
-        year_groups = {}
-        for ws, year in manager.connection_years.items():
-            if year not in year_groups:
-                year_groups[year] = []
-            year_groups[year].append(ws)
-            
-        # Send updates for each year found
-        for year, websockets in year_groups.items():
-            # Optimization: Fetch/Generate once per year, then send to all subscribers
-            # But get_leaderboard is async, so we can do it inside send_update or here.
-            # For simplicity, reuse the logic but refactor slightly if needed.
-            # To avoid implementing logic twice, I'll just call send_update for each WS for now.
-            # In production, we'd cache the result per year.
-            for ws in websockets:
-                try:
-                    await manager.send_update(ws, year)
-                except Exception:
-                    # Connection might be closed
-                    pass
+        started = time.perf_counter()
+        try:
+            await bus.announce(manager.subscribed_years())
+            if await bus.elect():
+                await manager.produce(bus)
+        except Exception as e:
+            print(f"Error broadcasting updates: {e}")
+        # Keep a steady cadence regardless of how long the tick took
+        await asyncio.sleep(max(0.0, UPDATE_INTERVAL - (time.perf_counter() - started)))
 
 
 if __name__ == "__main__":
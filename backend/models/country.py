@@ -38,3 +38,18 @@ class ScenarioResponse(BaseModel):
     new_gsi: float
     gsi_change: float
     details: dict
+
+class ScenarioSweepRequest(BaseModel):
+    iso: str
+    year: int = 2050
+    military_change_percents: List[float] = [-50.0, -40.0, -30.0, -20.0, -10.0, 0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    population_change_percents: List[float] = [-20.0, -15.0, -10.0, -5.0, 0.0, 5.0, 10.0, 15.0, 20.0]
+
+class ScenarioSweepResponse(BaseModel):
+    iso: str
+    year: int
+    original_gsi: float
+    military_change_percents: List[float]
+    population_change_percents: List[float]
+    # new_gsi[i][j] is the GSI for military_change_percents[i] and population_change_percents[j]
+    new_gsi: List[List[float]]
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Settings, settings as default_settings
+from services.fast_json import dumps, loads
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional multi-worker backend
+    aioredis = None
+
+# One live tick as published by the producer: year -> jittered leaderboard entries
+Tick = Dict[int, List[dict]]
+
+# Compare-and-act on the producer lease in one round trip, so a lease that lapsed and was taken by
+# another worker between the check and the write is never extended or deleted by its old holder
+RENEW_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def worker_id() -> str:
+    """Unique per process, readable in the producer lease (host:pid:random)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class InProcessBus:
+    """Single-worker bus: this process is always the producer and ticks go straight to its fan-out"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.worker = worker_id()
+        self.is_producer = True
+        self.skipped = 0
+        self._years: Set[int] = set()
+        self._queues: List[asyncio.Queue] = []
+
+    async def elect(self) -> bool:
+        return True
+
+    async def announce(self, years: Iterable[int]):
+        self._years = set(years)
+
+    async def subscribed_years(self) -> Set[int]:
+        return set(self._years)
+
+    async def publish(self, tick: Tick):
+        for queue in self._queues:
+            if queue.full():
+                # The fan-out is still sending an older tick; it skips straight to this one
+                queue.get_nowait()
+                self.skipped += 1
+            queue.put_nowait(tick)
+
+    async def ticks(self) -> AsyncIterator[Tick]:
+        queue = asyncio.Queue(maxsize=1)
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    async def close(self):
+        pass
+
+    def info(self) -> dict:
+        return {"backend": self.name, "worker": self.worker, "producer": True, "skipped": self.skipped}
+
+
+class RedisBus:
+    """Pub/sub over a Redis-protocol server (redis-server, KeyDB, fakeredis...), shared by every worker and node.
+
+    Workers compete for a lease key each tick; the holder is the only one that builds frames, and every
+    worker (the holder included) fans out what arrives on the channel. Each worker also refreshes the years
+    its sockets subscribe to, so the producer builds only those. If the producer dies its lease lapses after
+    ``lease`` seconds and another worker takes over. A dropped subscription is retried with backoff
+    between ``reconnect_delay`` and ``max_reconnect_delay`` seconds.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "futureatlas:live", lease: float = 6.0,
+                 client=None, reconnect_delay: float = 0.5, max_reconnect_delay: float = 30.0):
+        if client is None:
+            if aioredis is None:
+                raise ImportError("The redis broadcast bus requires the redis package")
+            client = aioredis.Redis.from_url(url, socket_connect_timeout=1.0)
+        self.client = client
+        self.url = url
+        self.prefix = prefix
+        self.lease = lease
+        self.worker = worker_id()
+        self.is_producer = False
+        self.skipped = 0
+        self.reconnects = 0
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.channel = f"{prefix}:ticks"
+        # worker -> {"expires": epoch ms, "years": [...]}, one field per worker
+        self.years_key = f"{prefix}:years"
+
+    @property
+    def _lease_ms(self) -> int:
+        return max(1, int(self.lease * 1000))
+
+    async def elect(self) -> bool:
+        """Take the producer lease if it is free, or renew it if this worker already holds it"""
+        key = f"{self.prefix}:producer"
+        if await self.client.set(key, self.worker, nx=True, px=self._lease_ms):
+            self.is_producer = True
+        else:
+            self.is_producer = bool(await self.client.eval(RENEW_LEASE, 1, key, self.worker, self._lease_ms))
+        return self.is_producer
+
+    async def announce(self, years: Iterable[int]):
+        # Each entry expires with the lease, so the years of a dead worker stop being built; readers prune it
+        entry = dumps({"expires": int(time.time() * 1000) + self._lease_ms, "years": sorted(years)})
+        await self.client.hset(self.years_key, self.worker, entry)
+
+    async def subscribed_years(self) -> Set[int]:
+        """Union of every live worker's years, from one HGETALL (no keyspace scan)"""
+        now = int(time.time() * 1000)
+        years: Set[int] = set()
+        expired = []
+        for worker, value in (await self.client.hgetall(self.years_key)).items():
+            entry = loads(value)
+            if entry["expires"] < now:
+                expired.append(worker)
+            else:
+                years.update(entry["years"])
+        if expired:
+            await self.client.hdel(self.years_key, *expired)
+        return years
+
+    async def publish(self, tick: Tick):
+        await self.client.publish(self.channel, dumps(tick))
+
+    async def ticks(self) -> AsyncIterator[Tick]:
+        """Ticks from the channel for as long as the caller iterates, resubscribing after connection errors"""
+        delay = self.reconnect_delay
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    # Behind by more than a tick: drop the stale ones and send the newest
+                    while True:
+                        newer = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0)
+                        if newer is None:
+                            break
+                        message = newer
+                        self.skipped += 1
+                    delay = self.reconnect_delay
+                    yield {int(year): entries for year, entries in loads(message["data"]).items()}
+            except Exception as e:
+                self.reconnects += 1
+                print(f"Broadcast bus subscription failed: {e!r}; resubscribing in {delay:.1f}s")
+            finally:
+                try:
+                    await pubsub.unsubscribe(self.channel)
+                    await getattr(pubsub, "aclose", pubsub.reset)()
+                except Exception:
+                    # The connection is already gone
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def close(self):
+        """Release the lease (so another worker takes over at once) and this worker's years"""
+        await self.client.eval(RELEASE_LEASE, 1, f"{self.prefix}:producer", self.worker)
+        await self.client.hdel(self.years_key, self.worker)
+        self.is_producer = False
+
+    def info(self) -> dict:
+        return {"backend": self.name, "url": self.url, "worker": self.worker, "producer": self.is_producer,
+                "skipped": self.skipped, "reconnects": self.reconnects}
+
+
+def create_bus(settings: Optional[Settings] = None, tick_interval: float = 2.0):
+    """Bus chosen by FUTUREATLAS_BROADCAST_BUS; falls back to in-process if redis is unavailable"""
+    settings = settings or default_settings
+    if settings.broadcast_bus == "redis":
+        try:
+            return RedisBus(settings.redis_url, lease=3 * tick_interval)
+        except ImportError as e:
+            print(f"{e}; using the in-process broadcast bus")
+    return InProcessBus()
@@ -0,0 +1,100 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Vectorized closed-form forecasts over a (countries x years) matrix.
+# Each function matches the per-country method it is named after in Forecaster.
+
+GROWTH_RATE = 0.01  # Same fallback growth as Forecaster._linear_extrapolation
+
+
+def panel_matrix(countries_data: Dict[str, pd.DataFrame], column: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Stack one column of every country's history into a (countries x years) matrix, NaN where missing"""
+    isos = list(countries_data.keys())
+    year_parts, value_parts, row_parts = [], [], []
+    for i, df in enumerate(countries_data.values()):
+        y = df['year'].to_numpy(dtype=np.float64)
+        v = df[column].to_numpy(dtype=np.float64)
+        keep = ~(np.isnan(y) | np.isnan(v))
+        year_parts.append(y[keep].astype(np.int64))
+        value_parts.append(v[keep])
+        row_parts.append(np.full(keep.sum(), i, dtype=np.int64))
+    if not year_parts:
+        return isos, np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+    all_years = np.concatenate(year_parts)
+    years = np.unique(all_years)
+    matrix = np.full((len(isos), len(years)), np.nan)
+    matrix[np.concatenate(row_parts), np.searchsorted(years, all_years)] = np.concatenate(value_parts)
+    return isos, years, matrix
+
+
+def linear_regression(years: np.ndarray, matrix: np.ndarray, target_years: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched least-squares line per row, evaluated at target years after each row's last observation.
+
+    Returns (values, mask) of shape (countries x target years); rows with fewer than two
+    points get zeros for every target year, like ``_linear_regression_forecast``.
+    """
+    target = np.asarray(target_years, dtype=np.float64)
+    if matrix.shape[1] == 0:
+        return _no_history(len(matrix), len(target))
+
+    valid = ~np.isnan(matrix)
+    n = valid.sum(axis=1)
+    x = np.broadcast_to(years.astype(np.float64), matrix.shape)
+
+    # Centre x per row so the normal equations stay well conditioned around year ~2000
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(valid, x, 0.0).sum(axis=1) / n
+        y_mean = np.where(valid, matrix, 0.0).sum(axis=1) / n
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        dy = np.where(valid, matrix - y_mean[:, None], 0.0)
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    values = slope[:, None] * (target[None, :] - x_mean[:, None]) + y_mean[:, None]
+    last_year = np.where(valid, x, -np.inf).max(axis=1)
+    mask = target[None, :] > last_year[:, None]
+
+    too_short = n < 2
+    values[too_short] = 0.0
+    mask[too_short] = True
+    return values, mask
+
+
+def linear_extrapolation(years: np.ndarray, matrix: np.ndarray, target_years: List[int],
+                         growth_rate: float = GROWTH_RATE) -> Tuple[np.ndarray, np.ndarray]:
+    """Compound growth from each row's last observation, broadcast over all target years"""
+    target = np.asarray(target_years, dtype=np.float64)
+    if matrix.shape[1] == 0:
+        return _no_history(len(matrix), len(target))
+
+    valid = ~np.isnan(matrix)
+    has_data = valid.any(axis=1)
+
+    # Column of the last observation in each row
+    last_col = matrix.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    last_value = matrix[np.arange(len(matrix)), last_col]
+    last_year = years[last_col].astype(np.float64)
+
+    steps = target[None, :] - last_year[:, None]
+    values = last_value[:, None] * (1 + growth_rate) ** steps
+    mask = steps > 0
+
+    values[~has_data] = 0.0
+    mask[~has_data] = True
+    return values, mask
+
+
+def _no_history(n_rows: int, n_targets: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros((n_rows, n_targets)), np.ones((n_rows, n_targets), dtype=bool)
+
+
+def to_long(isos: List[str], metric: str, target_years: List[int], values: np.ndarray, mask: np.ndarray) -> pd.DataFrame:
+    """Flatten masked (countries x target years) forecasts to iso/metric/year/value rows"""
+    rows, cols = np.nonzero(mask)
+    return pd.DataFrame({
+        'iso': np.asarray(isos, dtype=object)[rows],
+        'metric': metric,
+        'year': np.asarray(target_years, dtype=np.int64)[cols],
+        'value': values[rows, cols]
+    })
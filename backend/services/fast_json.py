@@ -0,0 +1,47 @@
+import json
+from typing import Any
+import numpy as np
+from fastapi.responses import JSONResponse
+from services.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # Optional; stdlib json is the fallback
+    orjson = None
+
+if orjson is not None:
+    # NumPy arrays and scalars are written directly from their buffers; NaN becomes null
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """stdlib fallback for the NumPy types orjson handles natively"""
+    if isinstance(value, np.ndarray):
+        return np.where(np.isnan(value), None, value).tolist() if value.dtype.kind == 'f' else value.tolist()
+    if isinstance(value, np.generic):
+        item = value.item()
+        return None if isinstance(item, float) and item != item else item
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@timed("serialization")
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, accepting NumPy arrays and scalars"""
+    if orjson is not None:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+def loads(data):
+    """Parse JSON bytes or text (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed (the app's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
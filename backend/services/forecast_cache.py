@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "forecast_cache.db")
+
+
+def fingerprint(historical_data: pd.DataFrame, metric: str, years: List[int], model_config: str) -> str:
+    """Content hash of one country's input series, the target years and the model configuration"""
+    df = historical_data[['year', metric]].dropna()
+    digest = hashlib.sha256()
+    digest.update(model_config.encode())
+    digest.update(metric.encode())
+    digest.update(np.asarray(years, dtype=np.int64).tobytes())
+    digest.update(df['year'].to_numpy(dtype=np.int64).tobytes())
+    digest.update(df[metric].to_numpy(dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """Content-addressed on-disk store of fitted parameters and forecast output.
+
+    Entries are evicted least-recently-used first once the stored payloads exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS forecasts ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_forecasts_last_used ON forecasts (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str, metric: str) -> Optional[Tuple[pd.DataFrame, Optional[dict]]]:
+        """Return (forecast, params) for a key, or None on a miss"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM forecasts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE forecasts SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        payload = json.loads(row[0])
+        forecast = pd.DataFrame({'year': payload['year'], metric: payload['value']})
+        return forecast, payload.get('params')
+
+    def put(self, key: str, metric: str, forecast: pd.DataFrame, params: Optional[dict] = None):
+        payload = json.dumps({
+            'year': [int(y) for y in forecast['year']],
+            'value': [float(v) for v in forecast[metric]],
+            'params': params,
+        })
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM forecasts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM forecasts ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM forecasts WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM forecasts")
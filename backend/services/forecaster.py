@@ -1,14 +1,218 @@
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Optional
-from prophet import Prophet
-from statsmodels.tsa.arima.model import ARIMA
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple, Optional, Sequence
 import warnings
+from services.metrics import timed, stage_seconds
 warnings.filterwarnings('ignore')
 
+# Forecast method used for each metric
+METRIC_METHODS = {
+    'gdp': 'forecast_gdp',
+    'population': 'forecast_population',
+    'military': 'forecast_military',
+}
+
+# Part of the forecast cache key; change when a metric's model or its settings change
+MODEL_CONFIGS = {
+    'gdp': 'prophet:v1:yearly_seasonality=True,daily_seasonality=False',
+    'population': 'arima:v1:order=(1,1,1)',
+    'military': 'linear:v1',
+}
+
+# (iso, metric, forecast, fitted params or None, fit seconds)
+FitResult = Tuple[str, str, pd.DataFrame, Optional[dict], float]
+
+def _forecast_chunk(chunk: List[Tuple[str, str, pd.DataFrame]], years: List[int]) -> List[FitResult]:
+    """Run a chunk of (iso, metric, history) fits in a worker process.
+    
+    Fit durations travel back with the results: metrics recorded in a worker never reach /metrics.
+    """
+    forecaster = Forecaster()
+    results = []
+    for iso, metric, historical_data in chunk:
+        method = getattr(forecaster, METRIC_METHODS[metric])
+        forecaster.models.pop(metric, None)
+        start = time.perf_counter()
+        forecast = method(historical_data, years)
+        seconds = time.perf_counter() - start
+        results.append((iso, metric, forecast, forecaster.models.get(metric), seconds))
+    return results
+
+def _terminate_pool(executor: ProcessPoolExecutor):
+    """Shut a pool down without waiting, killing workers stuck in fits that can't be interrupted"""
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+MODEL_FAMILIES = ('standard', 'fast')
+
 class Forecaster:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, task_timeout: float = 120.0, chunk_size: int = 3,
+                 model_family: str = 'standard', cache=None):
+        # Fitted parameters of the most recent fit, by metric
         self.models = {}
+        # 'standard' fits Prophet/ARIMA/linear per country; 'fast' fits closed-form linear models for all countries at once
+        if model_family not in MODEL_FAMILIES:
+            raise ValueError(f"Unknown model family: {model_family}")
+        self.model_family = model_family
+        # Worker processes for forecast_all; 0 runs every fit in this process
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        # Seconds a single fit may take before falling back to linear extrapolation
+        self.task_timeout = task_timeout
+        # Fits sent to a worker per submission
+        self.chunk_size = max(1, chunk_size)
+        # Optional ForecastCache; forecast_all only fits series whose input changed
+        self.cache = cache
+    
+    @timed("forecast_all")
+    def forecast_all(self, countries_data: Dict[str, pd.DataFrame], years: List[int],
+                     metrics: Sequence[str] = ('gdp', 'population', 'military')) -> pd.DataFrame:
+        """Forecast every country and metric, fanning the fits across a process pool.
+        
+        Returns a long-format frame with iso, metric, year and value columns. Fits that
+        fail, time out or die with their worker fall back to ``_linear_extrapolation``.
+        """
+        if self.model_family == 'fast':
+            return self.forecast_all_fast(countries_data, years, metrics)
+        
+        tasks = [(iso, metric, df) for iso, df in countries_data.items() for metric in metrics]
+        results = {}
+        
+        # Reuse cached fits for unchanged series
+        keys = {}
+        to_fit = tasks
+        if self.cache is not None:
+            from services.forecast_cache import fingerprint
+            to_fit = []
+            for iso, metric, df in tasks:
+                key = fingerprint(df, metric, years, MODEL_CONFIGS[metric])
+                keys[(iso, metric)] = key
+                cached = self.cache.get(key, metric)
+                if cached is None:
+                    to_fit.append((iso, metric, df))
+                else:
+                    results[(iso, metric)] = cached[0]
+        
+        chunks = [to_fit[i:i + self.chunk_size] for i in range(0, len(to_fit), self.chunk_size)]
+        if self.max_workers <= 0:
+            fitted = [result for chunk in chunks for result in _forecast_chunk(chunk, years)]
+        else:
+            fitted = self._run_pool(chunks, years)
+        
+        for iso, metric, forecast, params, seconds in fitted:
+            stage_seconds.observe(seconds, stage="forecast_fit", metric=metric)
+            results[(iso, metric)] = forecast
+            # No params means the model failed and the fallback ran; leave it uncached so the real fit is retried
+            if self.cache is not None and params is not None:
+                self.cache.put(keys[(iso, metric)], metric, forecast, params)
+        
+        frames = []
+        for iso, metric, historical_data in tasks:
+            forecast = results.get((iso, metric))
+            if forecast is None:
+                forecast = self._linear_extrapolation(historical_data, metric, years)
+            frames.append(pd.DataFrame({
+                'iso': iso,
+                'metric': metric,
+                'year': forecast['year'].astype(int).values,
+                'value': forecast[metric].astype(float).values
+            }))
+        
+        if not frames:
+            return pd.DataFrame(columns=['iso', 'metric', 'year', 'value'])
+        return pd.concat(frames, ignore_index=True)
+    
+    def forecast_all_fast(self, countries_data: Dict[str, pd.DataFrame], years: List[int],
+                          metrics: Sequence[str] = ('gdp', 'population', 'military'),
+                          model: str = 'linear') -> pd.DataFrame:
+        """Vectorized forecast of every country in one pass per metric.
+        
+        ``model='linear'`` matches ``_linear_regression_forecast`` and ``model='growth'``
+        matches ``_linear_extrapolation``, country by country.
+        """
+        from services import fast_forecast
+        
+        fit = {'linear': fast_forecast.linear_regression, 'growth': fast_forecast.linear_extrapolation}[model]
+        frames = []
+        for metric in metrics:
+            isos, history_years, matrix = fast_forecast.panel_matrix(countries_data, metric)
+            values, mask = fit(history_years, matrix, years)
+            frames.append(fast_forecast.to_long(isos, metric, years, values, mask))
+        
+        if not frames:
+            return pd.DataFrame(columns=['iso', 'metric', 'year', 'value'])
+        return pd.concat(frames, ignore_index=True)
+    
+    def _run_pool(self, chunks: List[list], years: List[int]) -> List[FitResult]:
+        """Keep at most one chunk per worker in flight so each chunk's deadline starts when it runs.
+        
+        Chunks missing from the result (timed out, raised, or lost with a crashed worker)
+        are left for the caller to fill with the fallback forecast.
+        """
+        results = []
+        pending = list(reversed(chunks))
+        in_flight = {}
+        # Timed-out futures whose worker is still busy; each leaves the set when its fit finally ends
+        stuck = set()
+        broken = False
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or in_flight:
+                if broken or len(stuck) >= self.max_workers:
+                    # A worker died, or every worker is busy with a timed-out fit: start over with a fresh pool
+                    _terminate_pool(executor)
+                    for chunk, _ in in_flight.values():
+                        print(f"Forecast lost with its worker pool: {self._describe(chunk)}")
+                    in_flight.clear()
+                    executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    stuck = set()
+                    broken = False
+                
+                while pending and len(in_flight) < self.max_workers - len(stuck):
+                    chunk = pending.pop()
+                    future = executor.submit(_forecast_chunk, chunk, years)
+                    deadline = time.monotonic() + self.task_timeout * len(chunk)
+                    in_flight[future] = (chunk, deadline)
+                
+                next_deadline = min(deadline for _, deadline in in_flight.values())
+                done, _ = wait(in_flight, timeout=max(0.0, next_deadline - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    chunk, _ = in_flight.pop(future)
+                    try:
+                        results.extend(future.result())
+                    except BrokenProcessPool:
+                        print(f"Forecast worker crashed during {self._describe(chunk)}")
+                        broken = True
+                    except Exception as e:
+                        print(f"Forecast error for {self._describe(chunk)}: {e}")
+                
+                now = time.monotonic()
+                for future, (chunk, deadline) in list(in_flight.items()):
+                    if now >= deadline:
+                        # A running fit can't be interrupted, so its worker stays busy
+                        print(f"Forecast timed out for {self._describe(chunk)}")
+                        del in_flight[future]
+                        if not future.cancel():
+                            stuck.add(future)
+                            future.add_done_callback(stuck.discard)
+        finally:
+            if stuck:
+                _terminate_pool(executor)
+            else:
+                executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
+    @staticmethod
+    def _describe(chunk: list) -> str:
+        return ", ".join(f"{iso}/{metric}" for iso, metric, _ in chunk)
     
     def forecast_gdp(self, historical_data: pd.DataFrame, years: List[int]) -> pd.DataFrame:
         """Forecast GDP using Prophet"""
@@ -24,6 +228,8 @@ class Forecaster:
                 # Fallback to linear extrapolation
                 return self._linear_extrapolation(historical_data, 'gdp', years)
             
+            # Imported on first fit; Prophet pulls in cmdstanpy and takes seconds to load
+            from prophet import Prophet
             model = Prophet(yearly_seasonality=True, daily_seasonality=False)
             model.fit(df)
             
@@ -35,6 +241,10 @@ class Forecaster:
             forecast_df['year'] = forecast_df['ds'].dt.year
             forecast_df = forecast_df[['year', 'yhat']].rename(columns={'yhat': 'gdp'})
             
+            # Recorded only once the forecast succeeded, so a failed predict() is never cached as a fit
+            self.models['gdp'] = {'model': 'prophet', 'params': {
+                name: np.asarray(value).tolist() for name, value in getattr(model, 'params', {}).items()
+            }}
             return forecast_df
         except Exception as e:
             print(f"Prophet forecast error: {e}")
@@ -49,6 +259,7 @@ class Forecaster:
                 return self._linear_extrapolation(historical_data, 'population', years)
             
             # Fit ARIMA model
+            from statsmodels.tsa.arima.model import ARIMA
             model = ARIMA(data, order=(1, 1, 1))
             fitted_model = model.fit()
             
@@ -65,6 +276,8 @@ class Forecaster:
                 'population': forecast[:len(forecast_years)]
             })
             
+            # Recorded only once the forecast succeeded, as in forecast_gdp
+            self.models['population'] = {'model': 'arima', 'params': np.asarray(fitted_model.params).tolist()}
             return result
         except Exception as e:
             print(f"ARIMA forecast error: {e}")
@@ -94,10 +307,12 @@ class Forecaster:
         forecast_years = [y for y in years if y > df['year'].max()]
         forecast_values = [coeffs[0] * year + coeffs[1] for year in forecast_years]
         
-        return pd.DataFrame({
+        result = pd.DataFrame({
             'year': forecast_years,
             column: forecast_values
         })
+        self.models[column] = {'model': 'linear', 'params': coeffs.tolist()}
+        return result
     
     def _linear_extrapolation(self, historical_data: pd.DataFrame, column: str, years: List[int]) -> pd.DataFrame:
         """Fallback linear extrapolation"""
@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from services.metrics import timed
+
+# Metric order along the last axis of a GSI panel
+PANEL_METRICS = ('gdp', 'population', 'military')
 
 class GSICalculator:
     def __init__(self):
@@ -26,6 +30,7 @@ class GSICalculator:
         
         return df
     
+    @timed("gsi_normalize")
     def _normalize(self, values: pd.Series) -> pd.Series:
         """Normalize values to 0-1 range"""
         # Filter out zeros and NaN for better normalization
@@ -50,6 +55,57 @@ class GSICalculator:
         
         return normalized
     
+    def calculate_gsi_panel(self, panel: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate GSI and per-year ranks for a whole (year, country, metric) panel at once
+        
+        Metrics are ordered as PANEL_METRICS and missing cells are NaN. Each year is
+        normalised across countries with the same rules as ``_normalize``. Ranks are
+        1-based within each year; countries without a GSI get rank 0.
+        """
+        panel = np.asarray(panel, dtype=np.float64)
+        normalized = self._normalize_panel(panel)
+        
+        gdp, population, military = (PANEL_METRICS.index(m) for m in ('gdp', 'population', 'military'))
+        gsi = (
+            self.economic_weight * normalized[..., gdp] +
+            self.military_weight * normalized[..., military] +
+            self.population_weight * normalized[..., population]
+        )
+        
+        missing = np.isnan(gsi)
+        order = np.argsort(np.where(missing, np.inf, -gsi), axis=1, kind='stable')
+        ranks = np.empty(gsi.shape, dtype=np.int64)
+        np.put_along_axis(ranks, order, np.arange(1, gsi.shape[1] + 1)[None, :], axis=1)
+        ranks[missing] = 0
+        
+        return gsi, ranks
+    
+    @timed("gsi_normalize")
+    def _normalize_panel(self, panel: np.ndarray) -> np.ndarray:
+        """Vectorized ``_normalize`` over the country axis of every (year, metric) slice"""
+        valid = panel > 0
+        has_valid = valid.any(axis=1, keepdims=True)
+        min_val = np.where(valid, panel, np.inf).min(axis=1, keepdims=True)
+        max_val = np.where(valid, panel, -np.inf).max(axis=1, keepdims=True)
+        value_range = max_val - min_val
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # np.maximum keeps NaN, like Series.clip
+            normalized = np.maximum((panel - min_val) / value_range, 0.0)
+        
+        normalized = np.where(has_valid & (value_range == 0), 0.5, normalized)
+        normalized = np.where(has_valid, normalized, 0.0)
+        return normalized
+    
+    @staticmethod
+    def panel_from_frame(data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pivot a long frame with year/iso/metric columns into (years, isos, panel)"""
+        years, year_idx = np.unique(data['year'].to_numpy(), return_inverse=True)
+        isos, iso_idx = np.unique(data['iso'].to_numpy().astype(str), return_inverse=True)
+        panel = np.full((len(years), len(isos), len(PANEL_METRICS)), np.nan)
+        panel[year_idx, iso_idx] = data[list(PANEL_METRICS)].to_numpy(dtype=np.float64)
+        return years, isos, panel
+    
     def calculate_gsi_for_countries(self, countries_data: Dict[str, pd.DataFrame], year: int) -> pd.DataFrame:
         """Calculate GSI for multiple countries at a specific year"""
         results = []
@@ -66,8 +122,14 @@ class GSICalculator:
                     'military': float(row.get('military', 0)) if pd.notna(row.get('military', 0)) else 0.0,
                 })
         
-        result_df = pd.DataFrame(results)
+        return self.rank_countries(pd.DataFrame(results))
+    
+    @timed("ranking")
+    def rank_countries(self, result_df: pd.DataFrame) -> pd.DataFrame:
+        """Normalise and rank a single-year frame with iso/gdp/population/military columns"""
+        result_df = result_df.copy()
         if not result_df.empty:
+            result_df[['gdp', 'population', 'military']] = result_df[['gdp', 'population', 'military']].fillna(0.0)
             # Ensure no NaN or zero-only columns before normalization
             result_df = result_df[(result_df['gdp'] > 0) | (result_df['population'] > 0) | (result_df['military'] > 0)]
             
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+INSIGHTS_YEAR = 2050
+
+
+class InsightsCache:
+    """Bounded LRU of generated insights per ISO, plus the shared 2050 rank table.
+    
+    Everything is dropped when the dataset version or the GSI weights change.
+    Safe to share between the worker threads that routes offload to.
+    """
+    
+    def __init__(self, db, calculator, maxsize: int = 256):
+        self.db = db
+        self.calculator = calculator
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._ranks: Optional[Dict[str, int]] = None
+        self._token: Optional[Tuple] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def weights(self) -> Tuple[float, float, float]:
+        """GSI weights the insights depend on; part of every cache key for them"""
+        c = self.calculator
+        return (c.economic_weight, c.military_weight, c.population_weight)
+    
+    def token(self) -> Tuple:
+        return (self.db.data_version,) + self.weights()
+    
+    def _validate(self):
+        token = self.token()
+        with self._lock:
+            if token != self._token:
+                self.entries.clear()
+                self._ranks = None
+                self._token = token
+    
+    def rank_table(self) -> Dict[str, int]:
+        """2050 rank of every ranked country, computed once per dataset version and weights"""
+        self._validate()
+        ranks = self._ranks
+        if ranks is None:
+            ranked = self.calculator.rank_countries(self.db.cube.year_frame(INSIGHTS_YEAR))
+            if ranked.empty:
+                ranks = {}
+            else:
+                ranks = {iso: int(rank) for iso, rank in zip(ranked['iso'], ranked['rank'])}
+            self._ranks = ranks
+        return ranks
+    
+    def get(self, iso: str, build: Callable[[str], Dict]) -> Dict:
+        """Cached insights for an ISO, generated with ``build`` on a miss"""
+        self._validate()
+        with self._lock:
+            if iso in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(iso)
+                return self.entries[iso]
+            self.misses += 1
+        
+        # Built outside the lock; a concurrent miss for the same ISO just builds it twice
+        result = build(iso)
+        with self._lock:
+            self.entries[iso] = result
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return result
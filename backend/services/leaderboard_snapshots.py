@@ -0,0 +1,99 @@
+import hashlib
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional
+from pydantic import TypeAdapter
+from models.country import LeaderboardEntry
+from services.fast_json import dumps
+from services.metrics import timed
+
+GDP, POPULATION, MILITARY, GSI = range(4)
+
+LEADERBOARD_YEARS = range(2020, 2051)
+
+# Entries are checked against the response model once per snapshot build, not per request
+ENTRIES_ADAPTER = TypeAdapter(List[LeaderboardEntry])
+
+
+class LeaderboardSnapshot(NamedTuple):
+    year: int
+    version: str
+    entries: List[dict]
+    body: bytes
+    etag: str
+
+
+@timed("ranking")
+def rank_year(cube, year: int, top_n: int = 20) -> List[dict]:
+    """Ranked, excluded-filtered top-N leaderboard entries for a year"""
+    rows, values = cube.year_slice(year)
+    
+    # Rank over every country with data, then drop excluded ones (ranks keep their gaps)
+    gsi = np.nan_to_num(values[:, GSI])
+    order = np.argsort(-gsi, kind='stable')
+    ranks = np.arange(1, len(order) + 1)
+    rows, values = rows[order], values[order]
+    
+    keep = ~cube.excluded[rows]
+    rows, values, ranks = rows[keep][:top_n], values[keep][:top_n], ranks[keep][:top_n]
+    
+    # Round whole columns at once, then convert to Python floats in one tolist()
+    rounded = np.column_stack([
+        np.round(values[:, GDP], 2),
+        np.round(values[:, POPULATION], 2),
+        np.round(values[:, MILITARY], 2),
+        np.round(values[:, GSI], 4),
+    ]).tolist()
+    return [
+        {"rank": rank, "iso": iso, "name": name, "gdp": gdp, "population": population, "military": military, "gsi": gsi}
+        for rank, iso, name, (gdp, population, military, gsi)
+        in zip(ranks.tolist(), cube.isos[rows].tolist(), cube.names[rows].tolist(), rounded)
+    ]
+
+
+class LeaderboardSnapshotStore:
+    """Pre-encoded leaderboard payloads for every valid year, tagged with the dataset version.
+    
+    Snapshots are rebuilt lazily the first time they are read after ``db.data_version`` changes.
+    """
+    
+    def __init__(self, db, years=LEADERBOARD_YEARS, top_n: int = 20):
+        self.db = db
+        self.years = years
+        self.top_n = top_n
+        self.version: Optional[str] = None
+        self.snapshots: Dict[int, LeaderboardSnapshot] = {}
+    
+    def get(self, year: int) -> LeaderboardSnapshot:
+        if self.version != self.db.data_version:
+            self.rebuild()
+        snapshot = self.snapshots.get(year)
+        if snapshot is None:
+            snapshot = self._build(self.db.cube, year, self.version)
+        return snapshot
+    
+    def rebuild(self):
+        cube, version = self.db.cube, self.db.data_version
+        self.snapshots = {year: self._build(cube, year, version) for year in self.years}
+        self.version = version
+    
+    def _build(self, cube, year: int, version: str) -> LeaderboardSnapshot:
+        entries = rank_year(cube, year, self.top_n)
+        ENTRIES_ADAPTER.validate_python(entries)
+        # Same encoding as the app's FastJSONResponse
+        body = dumps(entries)
+        return LeaderboardSnapshot(year, version, entries, body, snapshot_etag(version, year, body))
+
+
+def snapshot_etag(version: str, year: int, body: bytes) -> str:
+    """Strong ETag for a leaderboard body: dataset version, year and a digest of the bytes"""
+    return '"%s-%d-%s"' % (version, year, hashlib.sha1(body).hexdigest()[:12])
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
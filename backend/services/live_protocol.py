@@ -0,0 +1,133 @@
+import zlib
+from typing import Dict, List, Optional, Union
+from services.fast_json import dumps
+
+try:
+    import msgpack
+except ImportError:  # Optional binary encoding
+    msgpack = None
+
+# Protocol 1 resends the full leaderboard every tick (the default).
+# Protocol 2 sends a keyframe, then deltas carrying only changed fields and rank moves.
+PROTOCOL_FULL = 1
+PROTOCOL_DELTA = 2
+
+ENCODINGS = ('json', 'deflate', 'msgpack')
+KEYFRAME_INTERVAL = 30  # Force a keyframe every N ticks so lagging clients resync
+VALUE_FIELDS = ('gdp', 'population', 'military', 'gsi')
+
+Payload = Union[str, bytes]
+
+
+class ClientState:
+    """Protocol options negotiated by one socket"""
+
+    __slots__ = ('protocol', 'encoding', 'last_seq')
+
+    def __init__(self, protocol: int = PROTOCOL_FULL, encoding: str = 'json'):
+        self.protocol = protocol
+        self.encoding = encoding
+        self.last_seq: Optional[int] = None
+
+    def negotiate(self, message: dict):
+        """Apply ``protocol``/``encoding`` keys from a client message"""
+        if 'protocol' in message:
+            protocol = int(message['protocol'])
+            self.protocol = protocol if protocol in (PROTOCOL_FULL, PROTOCOL_DELTA) else PROTOCOL_FULL
+            self.last_seq = None
+        if 'encoding' in message:
+            encoding = str(message['encoding'])
+            if encoding == 'msgpack' and msgpack is None:
+                encoding = 'json'
+            self.encoding = encoding if encoding in ENCODINGS else 'json'
+
+
+def encode(message, encoding: str = 'json') -> Payload:
+    """Encode a message as a text (json) or binary (deflate, msgpack) frame"""
+    if encoding == 'msgpack' and msgpack is not None:
+        return msgpack.packb(message, use_bin_type=True)
+    data = dumps(message)
+    if encoding == 'deflate':
+        return zlib.compress(data)
+    return data.decode("utf-8")
+
+
+def diff_entries(previous: List[dict], current: List[dict]) -> dict:
+    """Changed value fields, rank moves, and entries that entered or left the list"""
+    previous_by_iso = {e['iso']: e for e in previous}
+    current_isos = set()
+    changes, ranks, added = {}, {}, []
+
+    for entry in current:
+        iso = entry['iso']
+        current_isos.add(iso)
+        before = previous_by_iso.get(iso)
+        if before is None:
+            added.append(entry)
+            continue
+        changed = {f: entry[f] for f in VALUE_FIELDS if entry[f] != before[f]}
+        if changed:
+            changes[iso] = changed
+        if entry['rank'] != before['rank']:
+            ranks[iso] = entry['rank']
+
+    removed = [iso for iso in previous_by_iso if iso not in current_isos]
+    return {"changes": changes, "ranks": ranks, "added": added, "removed": removed}
+
+
+class YearStream:
+    """Sequenced frames for one year, shared by every protocol-2 subscriber of that year.
+
+    Each payload is encoded at most once per tick and encoding.
+    """
+
+    def __init__(self, year: int):
+        self.year = year
+        self.seq = 0
+        self.entries: Optional[List[dict]] = None
+        self._delta: Optional[dict] = None
+        self._keyframes: Dict[str, Payload] = {}
+        self._deltas: Dict[str, Payload] = {}
+
+    def advance(self, entries: List[dict]):
+        if self.entries is not None and self.seq % KEYFRAME_INTERVAL != 0:
+            self._delta = diff_entries(self.entries, entries)
+        else:
+            self._delta = None
+        self.seq += 1
+        self.entries = entries
+        self._keyframes.clear()
+        self._deltas.clear()
+
+    def keyframe(self, encoding: str) -> Payload:
+        if encoding not in self._keyframes:
+            self._keyframes[encoding] = encode({
+                "type": "keyframe",
+                "protocol": PROTOCOL_DELTA,
+                "year": self.year,
+                "seq": self.seq,
+                "data": self.entries,
+            }, encoding)
+        return self._keyframes[encoding]
+
+    def delta(self, encoding: str) -> Optional[Payload]:
+        if self._delta is None:
+            return None
+        if encoding not in self._deltas:
+            self._deltas[encoding] = encode({
+                "type": "delta",
+                "year": self.year,
+                "seq": self.seq,
+                **self._delta,
+            }, encoding)
+        return self._deltas[encoding]
+
+    def frame_for(self, state: ClientState) -> Payload:
+        """Delta if the client holds the previous frame, otherwise a keyframe"""
+        payload = None
+        if state.last_seq == self.seq - 1:
+            payload = self.delta(state.encoding)
+        if payload is None:
+            payload = self.keyframe(state.encoding)
+        state.last_seq = self.seq
+        return payload
@@ -0,0 +1,182 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Prometheus text exposition (format 0.0.4) without a client library dependency.
+# Recording is a perf_counter pair, a bisect and a short locked update, cheap enough to leave on.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; fine at the low end where most stages sit, coarse up to multi-second forecast fits
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(counts), total, n) for key, (counts, total, n) in self._series.items()]
+        for key, counts, total, n in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {n}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+        return lines
+
+
+class Collected:
+    """Metric whose samples are read from existing state at scrape time (cache counters, connections)"""
+
+    def __init__(self, name: str, kind: str, help: str, collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = sorted((_labels(labels), value) for labels, value in self.collect())
+        except Exception as e:
+            print(f"Metrics collector {self.name} failed: {e}")
+            return lines
+        lines += [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in samples]
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def collected(self, name: str, kind: str, help: str, collect: Callable):
+        return self.register(Collected(name, kind, help, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    "futureatlas_stage_seconds",
+    "Time spent in hot-path stages (db_fetch, dataframe_build, gsi_normalize, ranking, serialization, ws_fanout, forecast_fit, ...)"
+))
+http_request_seconds = registry.register(Histogram(
+    "futureatlas_http_request_seconds", "HTTP request latency by route template and method"
+))
+http_requests_total = registry.register(Counter(
+    "futureatlas_http_requests_total", "HTTP requests by route template, method and status"
+))
+event_loop_lag_seconds = registry.register(Histogram(
+    "futureatlas_event_loop_lag_seconds", "How late the event loop woke a periodic probe task",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+
+
+def timed(stage: str, **labels):
+    """Decorator recording each call's duration under ``futureatlas_stage_seconds{stage=...}``"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stage_seconds.observe(time.perf_counter() - start, stage=stage, **labels)
+        return wrapper
+    return decorate
+
+
+def stage(name: str, **labels):
+    """Context manager form of ``timed``"""
+    return stage_seconds.time(stage=name, **labels)
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Record how far past ``interval`` each wake-up lands; long blocking calls on the loop show up here"""
+    import asyncio
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.observe(max(0.0, time.perf_counter() - expected))
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Settings, settings as default_settings
+
+try:
+    import redis
+except ImportError:  # Optional shared backend
+    redis = None
+
+# Cached values are pre-serialized response bodies
+Body = bytes
+
+
+class MemoryBackend:
+    """In-process LRU with a per-entry TTL. Each uvicorn worker has its own."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Body]:
+        with self._lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Body):
+        with self._lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def info(self) -> dict:
+        return {"backend": "memory", "entries": len(self.entries), "maxsize": self.maxsize, "ttl": self.ttl}
+
+
+class RedisBackend:
+    """Shared store speaking the Redis protocol (redis-server, KeyDB, fakeredis...), so workers share entries.
+
+    Eviction is left to the server (``maxmemory-policy allkeys-lru``); entries also expire after ``ttl``.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl: float = 300.0, prefix: str = "futureatlas:cache",
+                 client=None):
+        if client is None:
+            if redis is None:
+                raise ImportError("The redis cache backend requires the redis package")
+            client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.client = client
+        self.url = url
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Body]:
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, value: Body):
+        self.client.set(f"{self.prefix}:{key}", value, ex=max(1, int(self.ttl)))
+
+    def clear(self):
+        # Only this application's keys; the server may be shared
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:*", count=500))
+        for i in range(0, len(keys), 500):
+            self.client.delete(*keys[i:i + 500])
+
+    def info(self) -> dict:
+        return {"backend": "redis", "url": self.url, "prefix": self.prefix, "ttl": self.ttl}
+
+
+class ResponseCache:
+    """Pre-serialized response bodies keyed by (dataset version, endpoint, params).
+
+    A version change makes every older key unreachable, so nothing needs invalidating on writes.
+    Backend errors are counted and treated as misses; the cache never fails a request.
+    """
+
+    def __init__(self, backend, version: Callable[[], Optional[Hashable]]):
+        self.backend = backend
+        self.version = version
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.errors = 0
+
+    def key(self, endpoint: str, params: Hashable, version: Hashable) -> str:
+        return f"{version}:{endpoint}:{params!r}"
+
+    async def get_or_build(self, endpoint: str, params: Hashable, build: Callable[[], Awaitable[Body]]) -> Body:
+        """Cached body for an endpoint call, or ``await build()`` and store it"""
+        version = self.version()
+        if version is None:
+            # Still initialising; nothing sensible to key on
+            return await build()
+        key = self.key(endpoint, params, version)
+
+        body = await self._call(self.backend.get, key)
+        if body is not None:
+            self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+            return body
+
+        self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+        body = await build()
+        await self._call(self.backend.set, key, body)
+        return body
+
+    async def _call(self, method, *args):
+        try:
+            if self.backend.blocking:
+                # Network round trip: keep it off the event loop
+                from data.async_db import run_blocking
+                return await run_blocking(method, *args)
+            return method(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"Response cache error: {e}")
+            return None
+
+    async def flush(self):
+        await self._call(self.backend.clear)
+
+    def stats(self) -> dict:
+        endpoints = sorted(set(self.hits) | set(self.misses))
+        per_endpoint = {}
+        for endpoint in endpoints:
+            hits, misses = self.hits.get(endpoint, 0), self.misses.get(endpoint, 0)
+            per_endpoint[endpoint] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4)}
+        total_hits, total_misses = sum(self.hits.values()), sum(self.misses.values())
+        total = total_hits + total_misses
+        return {
+            **self.backend.info(),
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": round(total_hits / total, 4) if total else 0.0,
+            "errors": self.errors,
+            "endpoints": per_endpoint,
+        }
+
+    def reset_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+        self.errors = 0
+
+
+def create_backend(settings: Optional[Settings] = None):
+    """Backend chosen by FUTUREATLAS_CACHE_BACKEND; falls back to memory if redis is unavailable"""
+    settings = settings or default_settings
+    if settings.cache_backend == "redis":
+        try:
+            return RedisBackend(settings.redis_url, ttl=settings.cache_ttl)
+        except ImportError as e:
+            print(f"Warning: {e}; falling back to the in-process memory cache")
+    return MemoryBackend(maxsize=settings.cache_maxsize, ttl=settings.cache_ttl)
@@ -0,0 +1,106 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from services.gsi_calculator import GSICalculator, PANEL_METRICS
+
+GDP, POPULATION, MILITARY = (PANEL_METRICS.index(m) for m in ('gdp', 'population', 'military'))
+
+
+class YearState:
+    """One year's metric vector with the two smallest and two largest positive values per metric.
+
+    Knowing the runner-up extremes gives every country's min/max "excluding itself" in O(1),
+    which is all a single-country tweak needs to renormalise that country.
+    """
+
+    def __init__(self, isos: np.ndarray, values: np.ndarray, calculator: GSICalculator):
+        self.isos = isos
+        self.values = values
+        self.row_of = {iso: i for i, iso in enumerate(isos)}
+
+        gsi, _ = calculator.calculate_gsi_panel(values[None, :, :])
+        self.gsi = gsi[0]
+
+        # A sentinel row keeps two candidates per metric even for a one-country year
+        valid = values > 0
+        sentinel = np.ones((1, values.shape[1]))
+        low = np.vstack([np.where(valid, values, np.inf), np.inf * sentinel])
+        high = np.vstack([np.where(valid, values, -np.inf), -np.inf * sentinel])
+        cols = np.arange(values.shape[1])
+
+        self.min1_idx, self.min2_idx = np.argsort(low, axis=0, kind='stable')[:2]
+        self.max1_idx, self.max2_idx = np.argsort(-high, axis=0, kind='stable')[:2]
+        self.min1, self.min2 = low[self.min1_idx, cols], low[self.min2_idx, cols]
+        self.max1, self.max2 = high[self.max1_idx, cols], high[self.max2_idx, cols]
+
+    def extremes_without(self, row) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-metric positive min and max over every country except ``row`` (broadcasts over rows)"""
+        row = np.asarray(row)[..., None]
+        lo = np.where(self.min1_idx == row, self.min2, self.min1)
+        hi = np.where(self.max1_idx == row, self.max2, self.max1)
+        return lo, hi
+
+
+class ScenarioEngine:
+    """What-if GSI recalculation served from the in-memory data cube"""
+
+    def __init__(self, db, calculator: Optional[GSICalculator] = None):
+        self.db = db
+        self.calculator = calculator or GSICalculator()
+        self.version: Optional[str] = None
+        self.states: Dict[int, YearState] = {}
+
+    def year_state(self, year: int) -> Optional[YearState]:
+        if self.version != self.db.data_version:
+            self.states = {}
+            self.version = self.db.data_version
+        if year not in self.states:
+            cube = self.db.cube
+            rows, values = cube.year_slice(year)
+            if len(rows) == 0:
+                return None
+            metrics = [cube.metric_index[m] for m in PANEL_METRICS]
+            self.states[year] = YearState(cube.isos[rows], values[:, metrics], self.calculator)
+        return self.states[year]
+
+    def evaluate(self, state: YearState, row, military_change_percent, population_change_percent) -> Dict[str, np.ndarray]:
+        """New GSI for ``row`` with scaled military/population; all arguments broadcast together"""
+        row = np.asarray(row)
+        military_factor = 1 + np.asarray(military_change_percent, dtype=np.float64) / 100
+        population_factor = 1 + np.asarray(population_change_percent, dtype=np.float64) / 100
+        row, military_factor, population_factor = np.broadcast_arrays(row, military_factor, population_factor)
+
+        original = state.values[row]
+        modified = original.copy()
+        modified[..., MILITARY] *= military_factor
+        modified[..., POPULATION] *= population_factor
+
+        # Extremes of everyone else, widened by the modified values themselves
+        lo, hi = state.extremes_without(row)
+        positive = modified > 0
+        lo = np.where(positive, np.minimum(lo, modified), lo)
+        hi = np.where(positive, np.maximum(hi, modified), hi)
+
+        normalized = self._normalize_one(modified, lo, hi)
+        c = self.calculator
+        new_gsi = (
+            c.economic_weight * normalized[..., GDP] +
+            c.military_weight * normalized[..., MILITARY] +
+            c.population_weight * normalized[..., POPULATION]
+        )
+        return {
+            "original": original,
+            "modified": modified,
+            "original_gsi": state.gsi[row],
+            "new_gsi": new_gsi,
+        }
+
+    @staticmethod
+    def _normalize_one(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """``GSICalculator._normalize`` for single values given the year's positive min/max"""
+        has_valid = np.isfinite(lo)
+        value_range = hi - lo
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normalized = np.maximum((values - lo) / value_range, 0.0)
+        normalized = np.where(has_valid & (value_range == 0), 0.5, normalized)
+        return np.where(has_valid, normalized, 0.0)
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Concurrent identical requests share one in-flight computation.
+
+    Calls are keyed by (name, normalized params, dataset version): while a computation for a key
+    is running, later callers await its result instead of starting their own. Nothing is kept once
+    it finishes; this only removes duplicate work among callers that overlap in time.
+    """
+
+    def __init__(self, name: str, version: Optional[Callable[[], Hashable]] = None):
+        self.name = name
+        self.version = version
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def key(self, params: Hashable) -> Hashable:
+        return (self.name, params, self.version() if self.version is not None else None)
+
+    async def do(self, params: Hashable, func, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` (a coroutine function), shared by concurrent callers with equal params"""
+        key = self.key(params)
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller disconnecting doesn't cancel the computation for the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away before it was raised
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+# Every group created through flight(), for the stats endpoint
+registry: Dict[str, SingleFlight] = {}
+
+
+def flight(name: str, version: Optional[Callable[[], Hashable]] = None) -> SingleFlight:
+    """The shared SingleFlight group for ``name``, created on first use"""
+    if name not in registry:
+        registry[name] = SingleFlight(name, version)
+    return registry[name]
+
+
+def stats() -> dict:
+    return {name: group.stats() for name, group in registry.items()}
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from services.broadcast_bus import InProcessBus, RedisBus
+
+async def _next(ticks):
+    return await asyncio.wait_for(ticks.__anext__(), timeout=2)
+
+def test_in_process_bus_delivers_latest_tick():
+    bus = InProcessBus()
+
+    async def run():
+        await bus.announce([2030, 2050])
+        assert await bus.elect() and await bus.subscribed_years() == {2030, 2050}
+        ticks = bus.ticks()
+        first = asyncio.ensure_future(_next(ticks))
+        await asyncio.sleep(0.05)
+        await bus.publish({2050: [{"iso": "chn"}]})
+        received = [await first]
+        # A fan-out that falls behind skips to the newest tick
+        await bus.publish({2050: [{"iso": "usa"}]})
+        await bus.publish({2050: [{"iso": "ind"}]})
+        received.append(await _next(ticks))
+        await ticks.aclose()
+        return received
+
+    assert asyncio.run(run()) == [{2050: [{"iso": "chn"}]}, {2050: [{"iso": "ind"}]}]
+    assert bus.skipped == 1 and bus._queues == []
+
+def test_redis_bus_elects_one_producer_and_fans_out_to_all():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [RedisBus(client=fakeredis.FakeAsyncRedis(server=server)) for _ in range(3)]
+
+    async def run():
+        streams = [worker.ticks() for worker in workers]
+        pending = [asyncio.ensure_future(_next(stream)) for stream in streams]
+        await asyncio.sleep(0.1)
+        for worker, years in zip(workers, ([2030], [2050], [2030, 2040])):
+            await worker.announce(years)
+        elected = [await worker.elect() for worker in workers]
+        producer = workers[elected.index(True)]
+        years = await producer.subscribed_years()
+        await producer.publish({year: [{"iso": "chn", "year": year}] for year in sorted(years)})
+        received = [await p for p in pending]
+        # Releasing the lease lets another worker take over on its next tick
+        await producer.close()
+        successor = [await worker.elect() for worker in workers if worker is not producer]
+        for stream in streams:
+            await stream.aclose()
+        return elected, years, received, successor
+
+    elected, years, received, successor = asyncio.run(run())
+    assert elected.count(True) == 1
+    assert years == {2030, 2040, 2050}
+    assert all(tick == {year: [{"iso": "chn", "year": year}] for year in (2030, 2040, 2050)} for tick in received)
+    assert successor.count(True) == 1
+
+def test_redis_bus_lease_is_renewed_only_by_its_holder():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeAsyncRedis()
+    old, new = RedisBus(client=client, lease=0.2), RedisBus(client=client, lease=5.0)
+    key = f"{old.prefix}:producer"
+
+    async def run():
+        assert await old.elect()
+        assert await old.elect()  # renews its own lease
+        # The lease lapses and another worker takes it before the old holder's next tick
+        await client.set(key, new.worker, px=5000)
+        renewed = await old.elect()
+        await old.close()
+        return renewed, await client.get(key), await client.pttl(key)
+
+    renewed, holder, ttl = asyncio.run(run())
+    assert not renewed and not old.is_producer
+    # Neither the renewal nor the release touched the new holder's lease
+    assert holder.decode() == new.worker and ttl > 1000
+
+def test_redis_bus_resubscribes_after_a_connection_error(monkeypatch, capsys):
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis.exceptions import ConnectionError
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server)
+    subscriber = RedisBus(client=client, reconnect_delay=0.05)
+    producer = RedisBus(client=fakeredis.FakeAsyncRedis(server=server))
+    subscriptions = []
+    create = client.pubsub
+
+    def pubsub(**kwargs):
+        subscriptions.append(create(**kwargs))
+        return subscriptions[-1]
+
+    monkeypatch.setattr(client, "pubsub", pubsub)
+
+    async def dropped(**kwargs):
+        raise ConnectionError("Connection reset by peer")
+
+    async def publish_until_received(ticks, tick):
+        pending = asyncio.ensure_future(ticks.__anext__())
+        # Ticks published while the subscriber is reconnecting are lost, as with a real server
+        while not pending.done():
+            await producer.publish(tick)
+            await asyncio.wait([pending], timeout=0.05)
+        return pending.result()
+
+    async def run():
+        ticks = subscriber.ticks()
+        first = await asyncio.wait_for(publish_until_received(ticks, {2050: [{"iso": "chn"}]}), timeout=5)
+        # The connection drops, and the server stays unreachable for the first resubscribe attempts
+        subscriptions[-1].get_message = dropped
+        server.connected = False
+        pending = asyncio.ensure_future(ticks.__anext__())
+        await asyncio.sleep(0.3)
+        server.connected = True
+        while not pending.done():
+            await producer.publish({2050: [{"iso": "usa"}]})
+            await asyncio.wait([pending], timeout=0.05)
+        resumed = pending.result()
+        await ticks.aclose()
+        return first, resumed
+
+    first, resumed = asyncio.run(run())
+    assert first == {2050: [{"iso": "chn"}]} and resumed == {2050: [{"iso": "usa"}]}
+    assert subscriber.reconnects >= 2 and len(subscriptions) == subscriber.reconnects + 1
+    assert "Broadcast bus subscription failed" in capsys.readouterr().out
+
+def test_redis_bus_years_expire_with_their_worker():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    alive, dead = RedisBus(client=client, lease=5.0), RedisBus(client=client, lease=0.05)
+
+    async def run():
+        await alive.announce([2030])
+        await dead.announce([2040, 2050])
+        both = await alive.subscribed_years()
+        await asyncio.sleep(0.1)
+        after = await alive.subscribed_years()
+        await alive.close()
+        return both, after, await client.hkeys(alive.years_key)
+
+    both, after, left = asyncio.run(run())
+    assert both == {2030, 2040, 2050} and after == {2030}
+    # Expired and closed workers are removed from the hash
+    assert left == []
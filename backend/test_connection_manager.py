@@ -0,0 +1,116 @@
+import asyncio
+import time
+import main
+from main import ConnectionManager
+
+class FakeWebSocket:
+    """Records when each frame and the close arrived; ``stall`` never completes a send, ``dead`` raises"""
+
+    def __init__(self, stall=False, dead=False):
+        self.stall = stall
+        self.dead = dead
+        self.received = []
+        self.closed_at = None
+
+    async def _deliver(self, data):
+        if self.dead:
+            raise RuntimeError("connection reset")
+        if self.stall:
+            await asyncio.Event().wait()
+        self.received.append(time.perf_counter())
+
+    async def send_text(self, data):
+        await self._deliver(data)
+
+    async def send_bytes(self, data):
+        await self._deliver(data)
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        self.closed_at = time.perf_counter()
+
+def _subscribe(manager, websockets, year=2050):
+    for ws in websockets:
+        manager.active_connections.append(ws)
+        manager.connection_years[ws] = year
+        manager.client_states[ws] = main.ClientState()
+
+def _entries():
+    return [{"rank": 1, "iso": "aaa", "name": "A", "gdp": 1.0, "population": 1.0, "military": 1.0, "gsi": 0.5}]
+
+def test_stalled_and_dead_sockets_are_evicted_without_delaying_others(monkeypatch):
+    monkeypatch.setattr(main, "SEND_TIMEOUT", 0.3)
+    manager = ConnectionManager()
+    healthy = [FakeWebSocket() for _ in range(5)]
+    stalled, dead = FakeWebSocket(stall=True), FakeWebSocket(dead=True)
+    _subscribe(manager, healthy[:2] + [stalled, dead] + healthy[2:])
+
+    async def tick():
+        started = time.perf_counter()
+        await manager.fan_out_tick({2050: _entries()})
+        return started
+
+    started = asyncio.run(tick())
+    # Everyone else got the tick straight away, not after the stalled send timed out
+    assert all(len(ws.received) == 1 and ws.received[0] - started < 0.1 for ws in healthy)
+    # Both bad sockets were dropped and closed, the stalled one once its send timed out
+    assert stalled.closed_at - started < 0.3 + 0.2
+    assert dead.closed_at is not None
+    assert stalled not in manager.connection_years and dead not in manager.connection_years
+    assert manager.active_connections == healthy
+    assert manager.stats["evicted"] == 2 and manager.stats["frames_sent"] == 5
+
+def test_streams_are_bounded_and_released():
+    from data.database import db
+    from services.live_protocol import PROTOCOL_DELTA
+    db.initialize()
+    manager = ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+
+    async def run():
+        for ws in (first, second):
+            await manager.connect(ws)
+        a, b = manager.active_connections
+        await manager.handle_message(a, {"protocol": PROTOCOL_DELTA, "year": 2040})
+        # Out-of-range years are ignored rather than opening a stream
+        for year in (1999, 2051, 10 ** 9):
+            await manager.handle_message(a, {"year": year})
+        assert manager.connection_years[a] == 2040
+        # Cycling through years keeps only the subscribed ones
+        for year in range(2020, 2051):
+            await manager.handle_message(a, {"year": year})
+        await manager.handle_message(b, {"protocol": PROTOCOL_DELTA, "year": 2030})
+        assert set(manager.streams) == {2050, 2030}
+        await manager.handle_message(a, {"year": 2030})
+        assert set(manager.streams) == {2030}
+        manager.disconnect(a)
+        assert set(manager.streams) == {2030}
+        manager.disconnect(b)
+        assert manager.streams == {}
+
+    asyncio.run(run())
+    assert len(first.received) == 1 + 31 + 1
+
+def test_supervise_restarts_a_failing_background_task(capsys):
+    runs = []
+
+    async def relay():
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise ConnectionError("redis went away")
+        if len(runs) == 2:
+            return
+        await asyncio.Event().wait()
+
+    async def run():
+        task = asyncio.ensure_future(main.supervise("Live update relay", relay, delay=0.01))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run())
+    assert runs == [0, 1, 2]
+    out = capsys.readouterr().out
+    assert "Live update relay failed: ConnectionError('redis went away')" in out
+    assert "Live update relay stopped" in out
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from main import app
+from api.routes import export
+
+client = TestClient(app)
+
+def _csv(response) -> list:
+    return list(csv.DictReader(io.StringIO(response.text)))
+
+def test_nan_is_an_empty_csv_field_and_ndjson_null(monkeypatch):
+    def stream_rows(query):
+        yield ["iso", "year", "gdp", "gsi"], [("aaa", 2050, 1.5, float("nan")), ("bbb", 2050, float("nan"), 0.25)]
+
+    monkeypatch.setattr(export.db, "stream_rows", stream_rows)
+    assert "".join(export._csv_stream(None)).splitlines() == ["iso,year,gdp,gsi", "aaa,2050,1.5,", "bbb,2050,,0.25"]
+    records = [json.loads(line) for line in "".join(export._ndjson_stream(None)).splitlines()]
+    assert records == [{"iso": "aaa", "year": 2050, "gdp": 1.5, "gsi": None},
+                       {"iso": "bbb", "year": 2050, "gdp": None, "gsi": 0.25}]
+
+def test_export_filters():
+    response = client.get("/api/export?format=csv&from=2030&to=2032&isos=CHN,usa&metrics=gdp,GSI")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = _csv(response)
+    assert list(rows[0]) == ["iso", "name", "region", "year", "gdp", "gsi"]
+    assert [(r["iso"], int(r["year"])) for r in rows] == [(iso, year) for iso in ("chn", "usa") for year in (2030, 2031, 2032)]
+
+    regions = _csv(client.get("/api/export?format=csv&regions=europe,Oceania&from=2050"))
+    assert regions and {r["region"] for r in regions} == {"Europe", "Oceania"}
+    assert {r["year"] for r in regions} == {"2050"}
+
+    records = [json.loads(line) for line in
+               client.get("/api/export?format=ndjson&isos=ind&to=2001&metrics=population").text.splitlines()]
+    assert [(r["iso"], r["name"], r["region"], r["year"]) for r in records] == [("ind", "India", "Asia", 2000), ("ind", "India", "Asia", 2001)]
+    assert all(set(r) == {"iso", "name", "region", "year", "population"} and r["population"] > 0 for r in records)
+
+def test_export_rejects_unknown_metrics():
+    response = client.get("/api/export?metrics=gdp,happiness")
+    assert response.status_code == 400
+    assert "happiness" in response.json()["detail"]
@@ -0,0 +1,128 @@
+import multiprocessing
+import time
+import numpy as np
+import pandas as pd
+from services.forecaster import Forecaster
+
+YEARS = list(range(2024, 2031))
+
+def _history(start: float, growth: float) -> pd.DataFrame:
+    years = np.arange(2000, 2024)
+    values = start * (1 + growth) ** (years - 2000)
+    return pd.DataFrame({'year': years, 'gdp': values, 'population': values / 10, 'military': values / 100})
+
+def _countries() -> dict:
+    return {'aaa': _history(100.0, 0.03), 'bbb': _history(50.0, 0.01), 'ccc': _history(10.0, -0.02)}
+
+def test_hung_fits_are_killed_and_fall_back(monkeypatch):
+    def hang(self, historical_data, years):
+        time.sleep(60)
+
+    # Workers are forked, so they inherit the patched method
+    monkeypatch.setattr(Forecaster, "forecast_military", hang)
+    forecaster = Forecaster(max_workers=1, task_timeout=0.5, chunk_size=1)
+    started = time.monotonic()
+    result = forecaster.forecast_all(dict(list(_countries().items())[:2]), YEARS, metrics=('military',))
+    assert time.monotonic() - started < 10
+    # Both timed out; the fallback growth forecast fills them in
+    assert sorted(result['iso'].unique()) == ['aaa', 'bbb']
+    assert not result['value'].isna().any()
+
+    # The workers stuck in the hung fits were terminated, not left running
+    deadline = time.monotonic() + 5
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert multiprocessing.active_children() == []
+
+def _edge_countries() -> dict:
+    countries = _countries()
+    gappy = _history(30.0, 0.02)
+    gappy.loc[[3, 10, 23], 'military'] = np.nan
+    countries['gap'] = gappy
+    # History ending before some target years, and a single observation
+    countries['old'] = _history(20.0, 0.05).iloc[:20]
+    countries['one'] = _history(5.0, 0.0).iloc[:1]
+    return countries
+
+def _sorted(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_values(['iso', 'metric', 'year']).reset_index(drop=True)
+
+def test_fast_linear_matches_per_country_regression():
+    countries = _edge_countries()
+    years = list(range(2018, 2031))
+    fast = Forecaster().forecast_all_fast(countries, years, metrics=('military',), model='linear')
+    # The standard family fits military with _linear_regression_forecast, country by country
+    slow = Forecaster(max_workers=0).forecast_all(countries, years, metrics=('military',))
+    fast, slow = _sorted(fast), _sorted(slow)
+    pd.testing.assert_frame_equal(fast[['iso', 'metric', 'year']], slow[['iso', 'metric', 'year']], check_dtype=False)
+    np.testing.assert_allclose(fast['value'], slow['value'], rtol=1e-9, atol=1e-9)
+
+def test_fast_growth_matches_linear_extrapolation():
+    countries = _edge_countries()
+    years = list(range(2018, 2031))
+    forecaster = Forecaster()
+    metrics = ('gdp', 'population', 'military')
+    fast = _sorted(forecaster.forecast_all_fast(countries, years, metrics=metrics, model='growth'))
+    frames = []
+    for iso, df in countries.items():
+        for metric in metrics:
+            forecast = forecaster._linear_extrapolation(df, metric, years)
+            frames.append(pd.DataFrame({'iso': iso, 'metric': metric, 'year': forecast['year'].astype(int),
+                                        'value': forecast[metric].astype(float)}))
+    slow = _sorted(pd.concat(frames, ignore_index=True))
+    pd.testing.assert_frame_equal(fast[['iso', 'metric', 'year']], slow[['iso', 'metric', 'year']], check_dtype=False)
+    np.testing.assert_allclose(fast['value'], slow['value'], rtol=1e-12)
+
+def test_fallback_forecasts_are_not_cached(tmp_path, monkeypatch):
+    import statsmodels.tsa.arima.model as arima
+    from services.forecast_cache import ForecastCache
+
+    class BrokenARIMA:
+        def __init__(self, *args, **kwargs):
+            raise RuntimeError("fit failed")
+
+    countries = _countries()
+    cache = ForecastCache(str(tmp_path / "forecasts.db"))
+    forecaster = Forecaster(max_workers=0, cache=cache)
+    metrics = ('population', 'military')
+
+    monkeypatch.setattr(arima, "ARIMA", BrokenARIMA)
+    forecaster.forecast_all(countries, YEARS, metrics=metrics)
+    forecaster.forecast_all(countries, YEARS, metrics=metrics)
+    # Only the linear military fits were stored; the failed ARIMA fits are retried
+    assert cache.hits == len(countries)
+
+    monkeypatch.undo()
+    cache.hits = 0
+    forecaster.forecast_all(countries, YEARS, metrics=metrics)
+    forecaster.forecast_all(countries, YEARS, metrics=metrics)
+    assert cache.hits == len(countries) * 3
+
+def test_failed_forecast_after_a_successful_fit_is_not_cached(tmp_path, monkeypatch):
+    import statsmodels.tsa.arima.model as arima
+    from services.forecast_cache import ForecastCache
+
+    class Fitted:
+        params = np.array([0.5, 0.1, 1.0])
+
+        def forecast(self, steps):
+            raise RuntimeError("forecast failed")
+
+    class FitsThenFails:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def fit(self):
+            return Fitted()
+
+    countries = _countries()
+    cache = ForecastCache(str(tmp_path / "forecasts.db"))
+    forecaster = Forecaster(max_workers=0, cache=cache)
+    monkeypatch.setattr(arima, "ARIMA", FitsThenFails)
+    forecaster.forecast_all(countries, YEARS, metrics=('population',))
+    forecaster.forecast_all(countries, YEARS, metrics=('population',))
+    # The fallback ran each time; nothing was stored under the ARIMA fingerprint
+    assert cache.hits == 0
+    direct = Forecaster()
+    direct.forecast_population(countries['aaa'], YEARS)
+    assert 'population' not in direct.models
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.gsi_calculator import GSICalculator, PANEL_METRICS
+
+calculator = GSICalculator()
+
+def _panel(seed: int = 0, years: int = 6, countries: int = 40) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    panel = rng.lognormal(mean=3.0, sigma=2.0, size=(years, countries, len(PANEL_METRICS)))
+    # Missing cells, zeros and negatives are skipped when finding the positive min/max
+    panel[0, :5, 0] = np.nan
+    panel[1, 3:8, 1] = 0.0
+    panel[2, 10, 2] = -5.0
+    # A metric with every value equal normalises to 0.5; one with no positive values to 0
+    panel[3, :, 2] = 7.0
+    panel[4, :, 1] = 0.0
+    # A year where one country has no data at all
+    panel[5, 0, :] = np.nan
+    return panel
+
+def _per_year(panel: np.ndarray, year: int) -> pd.Series:
+    frame = pd.DataFrame(panel[year], columns=list(PANEL_METRICS))
+    return calculator.calculate_gsi(frame)['gsi']
+
+def test_panel_gsi_matches_per_year_calculation():
+    panel = _panel()
+    gsi, _ = calculator.calculate_gsi_panel(panel)
+    for year in range(panel.shape[0]):
+        np.testing.assert_allclose(gsi[year], _per_year(panel, year).to_numpy(), rtol=1e-12, equal_nan=True)
+
+def test_panel_ranks_follow_gsi_order():
+    panel = _panel(seed=1)
+    gsi, ranks = calculator.calculate_gsi_panel(panel)
+    for year in range(panel.shape[0]):
+        series = _per_year(panel, year)
+        ranked = series.dropna().sort_values(ascending=False, kind='stable')
+        expected = np.zeros(len(series), dtype=np.int64)
+        expected[ranked.index.to_numpy()] = np.arange(1, len(ranked) + 1)
+        np.testing.assert_array_equal(ranks[year], expected)
+
+@pytest.mark.parametrize("values", [
+    [[5.0, 1.0, 2.0]],                     # one country: every metric is its own min and max
+    [[5.0, 1.0, 2.0], [5.0, 1.0, 2.0]],    # two equal countries
+    [[0.0, 0.0, 0.0], [3.0, 0.0, 1.0]],    # zeros are not candidates for the minimum
+])
+def test_panel_edge_cases(values):
+    panel = np.array([values], dtype=np.float64)
+    gsi, ranks = calculator.calculate_gsi_panel(panel)
+    np.testing.assert_allclose(gsi[0], _per_year(panel, 0).to_numpy(), rtol=1e-12)
+    assert sorted(ranks[0].tolist()) == list(range(1, len(values) + 1))
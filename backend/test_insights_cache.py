@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from main import app
+from services.insights_cache import InsightsCache
+
+client = TestClient(app)
+
+def _cache(maxsize=256):
+    db = SimpleNamespace(data_version="v1")
+    calculator = SimpleNamespace(economic_weight=0.5, military_weight=0.3, population_weight=0.2)
+    builds = []
+
+    def build(iso):
+        builds.append(iso)
+        return {"iso": iso, "version": db.data_version, "weights": calculator.economic_weight}
+
+    return InsightsCache(db, calculator, maxsize=maxsize), db, calculator, build, builds
+
+def test_hits_until_the_dataset_version_changes():
+    cache, db, _, build, builds = _cache()
+    assert cache.get("chn", build) is cache.get("chn", build)
+    assert (cache.hits, cache.misses, builds) == (1, 1, ["chn"])
+    db.data_version = "v2"
+    assert cache.get("chn", build)["version"] == "v2"
+    assert builds == ["chn", "chn"]
+
+def test_weight_change_invalidates():
+    cache, _, calculator, build, builds = _cache()
+    cache.get("usa", build)
+    calculator.economic_weight = 0.6
+    assert cache.get("usa", build)["weights"] == 0.6
+    assert builds == ["usa", "usa"]
+
+def test_lru_evicts_the_least_recently_used():
+    cache, _, _, build, builds = _cache(maxsize=2)
+    cache.get("aaa", build)
+    cache.get("bbb", build)
+    cache.get("aaa", build)  # bbb is now the oldest
+    cache.get("ccc", build)
+    assert list(cache.entries) == ["aaa", "ccc"]
+    cache.get("bbb", build)
+    assert builds == ["aaa", "bbb", "ccc", "bbb"]
+
+def test_batch_insights_match_single_calls_and_report_unknown_isos():
+    response = client.get("/api/insights?isos=CHN, usa,zzz,chn,")
+    assert response.status_code == 200
+    payload = response.json()
+    # Requested order, duplicates and blanks dropped, unknown codes listed rather than failing the batch
+    assert [item["iso"] for item in payload["data"]] == ["chn", "usa"]
+    assert payload["missing"] == ["zzz"]
+    assert payload["data"][0] == client.get("/api/insights/chn").json()
+    assert client.get("/api/insights/zzz").status_code == 404
+
+def test_batch_insights_size_limit():
+    from api.routes.insights import MAX_BATCH_SIZE
+    isos = ",".join(f"x{i}" for i in range(MAX_BATCH_SIZE + 1))
+    assert client.get(f"/api/insights?isos={isos}").status_code == 400
+
+def test_weight_change_serves_fresh_insights(monkeypatch):
+    from api.routes.insights import gsi_calculator
+    before = client.get("/api/insights/ind").json()
+    batch_before = client.get("/api/insights?isos=ind").json()
+    monkeypatch.setattr(gsi_calculator, "economic_weight", 0.9)
+    monkeypatch.setattr(gsi_calculator, "military_weight", 0.05)
+    monkeypatch.setattr(gsi_calculator, "population_weight", 0.05)
+    after = client.get("/api/insights/ind").json()
+    assert after["current"]["gsi"] != before["current"]["gsi"]
+    assert client.get("/api/insights?isos=ind").json()["data"] == [after]
+    assert batch_before["data"] == [before]
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+from main import app
+from services.leaderboard_snapshots import etag_matches
+
+client = TestClient(app)
+
+def test_leaderboard_revalidates_with_etag():
+    first = client.get("/api/leaderboard?year=2050")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.headers["Cache-Control"] == "public, no-cache"
+    assert len(first.json()) == 20
+
+    cached = client.get("/api/leaderboard?year=2050", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Weak validators and lists of candidates match too
+    for header in (f"W/{etag}", f'"stale", {etag}', "*"):
+        assert client.get("/api/leaderboard?year=2050", headers={"If-None-Match": header}).status_code == 304
+
+    assert client.get("/api/leaderboard?year=2050", headers={"If-None-Match": '"stale"'}).status_code == 200
+    # Each year has its own tag
+    other = client.get("/api/leaderboard?year=2030", headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["ETag"] != etag
+
+def test_etag_matches():
+    assert etag_matches('W/"v1-2050-abc"', '"v1-2050-abc"')
+    assert etag_matches(' "x" , "v1-2050-abc" ', '"v1-2050-abc"')
+    assert not etag_matches(None, '"v1-2050-abc"')
+    assert not etag_matches('"v1-2050-abd"', '"v1-2050-abc"')
+
+def test_etag_is_computed_with_the_snapshot(monkeypatch):
+    from api.routes import leaderboard
+    from services import leaderboard_snapshots
+    snapshot = leaderboard.snapshots.get(2045)
+    client.get("/api/leaderboard?year=2045")
+
+    def no_hashing(*args):
+        raise AssertionError("ETag hashed per request")
+
+    # Served from the cached entry: the body is not hashed again
+    monkeypatch.setattr(leaderboard_snapshots.hashlib, "sha1", no_hashing)
+    response = client.get("/api/leaderboard?year=2045")
+    assert response.headers["ETag"] == snapshot.etag
+    assert response.content == snapshot.body
@@ -0,0 +1,83 @@
+import json
+import zlib
+from fastapi.testclient import TestClient
+from services import live_protocol
+from services.live_protocol import ClientState, YearStream, KEYFRAME_INTERVAL, PROTOCOL_DELTA, PROTOCOL_FULL
+
+def _entries(gsi_a=0.9, gsi_b=0.8):
+    entries = [
+        {"rank": 1, "iso": "aaa", "name": "A", "gdp": 10.0, "population": 5.0, "military": 1.0, "gsi": gsi_a},
+        {"rank": 2, "iso": "bbb", "name": "B", "gdp": 8.0, "population": 4.0, "military": 2.0, "gsi": gsi_b},
+    ]
+    entries.sort(key=lambda e: e["gsi"], reverse=True)
+    for rank, entry in enumerate(entries, 1):
+        entry["rank"] = rank
+    return entries
+
+def test_keyframe_then_deltas_with_rank_moves():
+    stream = YearStream(2050)
+    state = ClientState(protocol=PROTOCOL_DELTA)
+    stream.advance(_entries())
+    keyframe = json.loads(stream.frame_for(state))
+    assert keyframe["type"] == "keyframe" and keyframe["seq"] == 1 and len(keyframe["data"]) == 2
+
+    stream.advance(_entries(gsi_a=0.7))
+    delta = json.loads(stream.frame_for(state))
+    assert delta == {"type": "delta", "year": 2050, "seq": 2, "changes": {"aaa": {"gsi": 0.7}},
+                     "ranks": {"aaa": 2, "bbb": 1}, "added": [], "removed": []}
+    assert state.last_seq == 2
+
+def test_seq_gap_and_resync_get_keyframes():
+    stream = YearStream(2050)
+    behind = ClientState(protocol=PROTOCOL_DELTA)
+    stream.advance(_entries())
+    stream.frame_for(behind)
+    # The client missed a tick: it can't apply the next delta, so it gets a keyframe
+    stream.advance(_entries(gsi_a=0.85))
+    stream.advance(_entries(gsi_a=0.86))
+    assert json.loads(stream.frame_for(behind))["type"] == "keyframe"
+    # A resync (or renegotiation) clears the client's position
+    behind.negotiate({"protocol": PROTOCOL_DELTA})
+    assert behind.last_seq is None
+    stream.advance(_entries(gsi_a=0.87))
+    assert json.loads(stream.frame_for(behind))["type"] == "keyframe"
+
+def test_periodic_keyframe():
+    stream = YearStream(2050)
+    state = ClientState(protocol=PROTOCOL_DELTA)
+    types = []
+    for i in range(KEYFRAME_INTERVAL + 1):
+        stream.advance(_entries(gsi_a=0.9 + i / 1000))
+        types.append(json.loads(stream.frame_for(state))["type"])
+    assert types[0] == "keyframe" and types[-1] == "keyframe"
+    assert set(types[1:-1]) == {"delta"}
+
+def test_encoding_negotiation(monkeypatch):
+    state = ClientState()
+    state.negotiate({"protocol": 7, "encoding": "brotli"})
+    assert (state.protocol, state.encoding) == (PROTOCOL_FULL, "json")
+    state.negotiate({"protocol": 2, "encoding": "deflate"})
+    assert (state.protocol, state.encoding) == (PROTOCOL_DELTA, "deflate")
+    monkeypatch.setattr(live_protocol, "msgpack", None)
+    state.negotiate({"encoding": "msgpack"})
+    assert state.encoding == "json"
+
+    stream = YearStream(2050)
+    stream.advance(_entries())
+    deflated = stream.keyframe("deflate")
+    assert isinstance(deflated, bytes)
+    assert json.loads(zlib.decompress(deflated)) == json.loads(stream.keyframe("json"))
+
+def test_websocket_negotiation_and_resync():
+    from main import app, db
+    # No lifespan, so no ticker: every frame received is a reply to this client's messages
+    db.initialize()
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"protocol": 2, "year": 2040})
+        keyframe = ws.receive_json()
+        assert keyframe["type"] == "keyframe" and keyframe["year"] == 2040
+        ws.send_json({"resync": True})
+        again = ws.receive_json()
+        assert again["type"] == "keyframe" and again["seq"] == keyframe["seq"]
+        ws.send_json({"encoding": "deflate", "year": 2040})
+        assert json.loads(zlib.decompress(ws.receive_bytes()))["type"] == "keyframe"
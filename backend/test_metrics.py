@@ -0,0 +1,47 @@
+from services.metrics import Histogram, Registry, timed, stage_seconds
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("demo_seconds", "Demo", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage='say "hi"')
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{stage="say \\"hi\\""} 4' in text
+
+def test_timed_records_stage():
+    @timed("test_stage")
+    def work():
+        return 42
+
+    assert work() == 42
+    assert 'futureatlas_stage_seconds_count{stage="test_stage"} 1' in "\n".join(stage_seconds.render())
+
+def _count(text: str, series: str) -> int:
+    lines = [line for line in text.splitlines() if line.startswith(series + " ")]
+    return int(lines[0].split()[-1]) if lines else 0
+
+def test_forecast_fit_times_from_workers_are_recorded():
+    import pandas as pd
+    from services.forecaster import Forecaster
+    history = pd.DataFrame({'year': range(2000, 2024), 'gdp': 1.0, 'population': 1.0,
+                            'military': [float(i) for i in range(24)]})
+    series = 'futureatlas_stage_seconds_count{metric="military",stage="forecast_fit"}'
+    for workers in (2, 0):
+        before = _count("\n".join(stage_seconds.render()), series)
+        Forecaster(max_workers=workers).forecast_all({'aaa': history, 'bbb': history}, [2030], metrics=('military',))
+        # Once per fit, whether it ran in a worker process or in this one
+        assert _count("\n".join(stage_seconds.render()), series) == before + 2
+
+def test_http_metrics_use_route_templates():
+    from fastapi.testclient import TestClient
+    from main import app
+    client = TestClient(app)
+    client.get("/api/timeseries/chn")
+    client.get("/api/health")
+    text = client.get("/metrics").text
+    assert 'route="/api/timeseries/{iso}"' in text
+    assert 'route="/api/health"' in text
+    assert 'route="/api/timeseries/chn"' not in text
@@ -0,0 +1,59 @@
+import sqlite3
+from sqlalchemy import create_engine
+from data.database import Database, ensure_indexes
+
+# Schema of futureatlas.db files created before the composite indexes existed
+LEGACY_SCHEMA = """
+CREATE TABLE countries (
+    id INTEGER NOT NULL PRIMARY KEY, iso VARCHAR, iso3 VARCHAR, name VARCHAR,
+    region VARCHAR, exclude_from_leaderboard BOOLEAN
+);
+CREATE UNIQUE INDEX ix_countries_iso ON countries (iso);
+CREATE UNIQUE INDEX ix_countries_iso3 ON countries (iso3);
+CREATE TABLE yearly_data (
+    id INTEGER NOT NULL PRIMARY KEY, country_id INTEGER, year INTEGER, gdp FLOAT,
+    population FLOAT, military FLOAT, gsi FLOAT,
+    FOREIGN KEY(country_id) REFERENCES countries (id)
+);
+CREATE INDEX ix_yearly_data_year ON yearly_data (year);
+"""
+
+def _legacy_engine(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany("INSERT INTO countries (id, iso, iso3, name) VALUES (?, ?, ?, ?)",
+                     [(i, f"c{i}", f"c{i}", f"Country {i}") for i in range(1, 51)])
+    conn.executemany("INSERT INTO yearly_data (country_id, year, gdp, population, military, gsi) VALUES (?, ?, 1, 1, 1, 0)",
+                     [(c, y) for c in range(1, 51) for y in range(2000, 2051)])
+    conn.commit()
+    conn.close()
+    engine = create_engine(f"sqlite:///{path}")
+    ensure_indexes(engine)
+    # Give the planner real statistics, as it has on a long-lived database
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return engine
+
+def _plan(engine, query) -> str:
+    compiled = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+def test_migration_adds_indexes(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    with engine.connect() as conn:
+        names = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list('yearly_data')")}
+    assert {"uq_yearly_data_country_year", "ix_yearly_data_year_country"} <= names
+
+def test_country_series_uses_composite_index(tmp_path):
+    plan = _plan(_legacy_engine(tmp_path), Database.country_query("c7"))
+    assert "USING INDEX uq_yearly_data_country_year" in plan or "USING COVERING INDEX uq_yearly_data_country_year" in plan
+    assert "TEMP B-TREE" not in plan
+    assert "SCAN yearly_data" not in plan
+
+def test_year_slice_uses_covering_index(tmp_path):
+    plan = _plan(_legacy_engine(tmp_path), Database.year_query(2050))
+    assert "USING COVERING INDEX ix_yearly_data_year_country" in plan
+    assert "TEMP B-TREE" not in plan
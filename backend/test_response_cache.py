@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from services.response_cache import MemoryBackend, RedisBackend, ResponseCache
+
+def _cache(backend, version="v1"):
+    state = {"version": version, "builds": 0}
+
+    async def build():
+        state["builds"] += 1
+        return b'{"n":%d}' % state["builds"]
+
+    return ResponseCache(backend, lambda: state["version"]), state, build
+
+def test_hits_are_keyed_by_version():
+    cache, state, build = _cache(MemoryBackend())
+
+    async def run():
+        first = await cache.get_or_build("leaderboard", 2050, build)
+        second = await cache.get_or_build("leaderboard", 2050, build)
+        state["version"] = "v2"
+        third = await cache.get_or_build("leaderboard", 2050, build)
+        return first, second, third
+
+    assert asyncio.run(run()) == (b'{"n":1}', b'{"n":1}', b'{"n":2}')
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["endpoints"]["leaderboard"]["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    backend = MemoryBackend(maxsize=2, ttl=10)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get("a") == b"1"  # a is now most recently used
+    backend.set("c", b"3")
+    assert backend.get("b") is None and backend.get("a") == b"1"
+
+    import services.response_cache as module
+    now = module.time.monotonic()
+    monkeypatch.setattr(module.time, "monotonic", lambda: now + 11)
+    assert backend.get("a") is None
+
+def test_backend_errors_are_misses():
+    class Broken(MemoryBackend):
+        def get(self, key):
+            raise ConnectionError("down")
+
+    cache, state, build = _cache(Broken())
+    assert asyncio.run(cache.get_or_build("countries", None, build)) == b'{"n":1}'
+    assert cache.stats()["errors"] == 1
+
+def test_redis_backend_shares_entries_between_caches():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    worker_a, state, build = _cache(RedisBackend(client=fakeredis.FakeRedis(server=server)))
+    worker_b, _, _ = _cache(RedisBackend(client=fakeredis.FakeRedis(server=server)))
+
+    async def run():
+        await worker_a.get_or_build("timeseries", "chn", build)
+        return await worker_b.get_or_build("timeseries", "chn", build)
+
+    assert asyncio.run(run()) == b'{"n":1}'
+    assert state["builds"] == 1
+    asyncio.run(worker_b.flush())
+    assert worker_a.backend.client.keys("futureatlas:cache:*") == []
+
+def test_redis_fallback_warns(monkeypatch, capsys):
+    import services.response_cache as module
+    from config import Settings
+    settings = Settings()
+    settings.cache_backend = "redis"
+    monkeypatch.setattr(module, "redis", None)
+    assert isinstance(module.create_backend(settings), MemoryBackend)
+    assert "Warning" in capsys.readouterr().out
+
+def test_admin_endpoints_need_a_configured_token(monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+    from api.routes import admin
+    client = TestClient(app)
+    monkeypatch.setattr(admin.settings, "admin_token", None)
+    assert client.get("/api/admin/cache").status_code == 403
+    assert client.post("/api/admin/cache/flush", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(admin.settings, "admin_token", "s3cret")
+    assert client.get("/api/admin/cache", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/admin/cache", headers={"X-Admin-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.gsi_calculator import GSICalculator, PANEL_METRICS
+from services.scenario_engine import ScenarioEngine, YearState, MILITARY, POPULATION
+
+calculator = GSICalculator()
+engine = ScenarioEngine(db=None, calculator=calculator)
+
+def _reference(values: np.ndarray, row: int, military_change: float, population_change: float):
+    """The original route: rebuild the year's frame with one row changed and renormalise everyone"""
+    frame = pd.DataFrame(values, columns=list(PANEL_METRICS))
+    original_gsi = calculator.calculate_gsi(frame)['gsi'].iloc[row]
+    modified = frame.copy()
+    modified.iloc[row, modified.columns.get_loc('military')] *= 1 + military_change / 100
+    modified.iloc[row, modified.columns.get_loc('population')] *= 1 + population_change / 100
+    return original_gsi, calculator.calculate_gsi(modified)['gsi'].iloc[row]
+
+def _check(values: np.ndarray, row: int, military_change: float, population_change: float):
+    state = YearState(np.array([f"c{i}" for i in range(len(values))]), values, calculator)
+    result = engine.evaluate(state, row, military_change, population_change)
+    original_gsi, new_gsi = _reference(values, row, military_change, population_change)
+    assert result["original_gsi"] == pytest.approx(original_gsi, rel=1e-12, abs=1e-15)
+    assert result["new_gsi"] == pytest.approx(new_gsi, rel=1e-12, abs=1e-15)
+
+def _values(seed: int = 0, countries: int = 30) -> np.ndarray:
+    return np.random.default_rng(seed).lognormal(mean=3.0, sigma=1.5, size=(countries, len(PANEL_METRICS)))
+
+def test_random_scenarios_match_full_renormalisation():
+    rng = np.random.default_rng(42)
+    values = _values()
+    for _ in range(200):
+        _check(values, int(rng.integers(len(values))), float(rng.uniform(-100, 200)), float(rng.uniform(-100, 200)))
+
+@pytest.mark.parametrize("metric", [MILITARY, POPULATION])
+@pytest.mark.parametrize("change", [-100.0, -90.0, 0.0, 500.0])
+def test_changing_the_extremes(metric, change):
+    values = _values(seed=1)
+    military, population = (change, 0.0) if metric == MILITARY else (0.0, change)
+    # The current maximum and minimum: the runner-up takes over when they move inwards
+    _check(values, int(np.argmax(values[:, metric])), military, population)
+    _check(values, int(np.argmin(values[:, metric])), military, population)
+
+def test_tied_maximum():
+    values = _values(seed=2)
+    top = np.argsort(values[:, MILITARY])[-2:]
+    values[top, MILITARY] = values[top, MILITARY].max()
+    _check(values, int(top[0]), -50.0, 0.0)
+    _check(values, int(top[1]), 25.0, 0.0)
+
+def test_zero_values():
+    values = _values(seed=3, countries=8)
+    values[2, MILITARY] = 0.0
+    values[4, POPULATION] = 0.0
+    for row in range(len(values)):
+        _check(values, row, 40.0, -30.0)
+
+@pytest.mark.parametrize("countries", [1, 2])
+def test_tiny_years(countries):
+    values = _values(seed=4, countries=countries)
+    for row in range(countries):
+        for change in (-100.0, -50.0, 0.0, 80.0):
+            _check(values, row, change, -change / 2)
+
+def test_batched_evaluation_matches_single_calls():
+    values = _values(seed=5)
+    state = YearState(np.array([f"c{i}" for i in range(len(values))]), values, calculator)
+    rows = np.arange(len(values))
+    changes = np.linspace(-60, 60, len(values))
+    batch = engine.evaluate(state, rows, changes, changes[::-1])["new_gsi"]
+    single = [engine.evaluate(state, r, m, p)["new_gsi"] for r, m, p in zip(rows, changes, changes[::-1])]
+    np.testing.assert_allclose(batch, single, rtol=1e-15)
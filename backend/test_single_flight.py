@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from services import single_flight
+from services.single_flight import SingleFlight
+
+def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight("test")
+    runs = []
+
+    async def compute(x):
+        runs.append(x)
+        await asyncio.sleep(0.05)
+        return {"value": x * 2}
+
+    async def run():
+        same = await asyncio.gather(*(group.do(("sweep", 3), compute, 3) for _ in range(50)))
+        other = await group.do(("sweep", 4), compute, 4)
+        return same, other
+
+    same, other = asyncio.run(run())
+    assert runs == [3, 4]
+    assert all(result is same[0] for result in same) and same[0] == {"value": 6}
+    assert other == {"value": 8}
+    assert group.stats() == {"calls": 51, "executed": 2, "coalesced": 49, "in_flight": 0}
+
+def test_calls_after_completion_run_again():
+    group = SingleFlight("test")
+
+    async def compute():
+        return object()
+
+    async def run():
+        return await group.do("k", compute), await group.do("k", compute)
+
+    first, second = asyncio.run(run())
+    assert first is not second
+    assert group.stats()["executed"] == 2 and group.stats()["coalesced"] == 0
+
+def test_exception_reaches_every_waiter():
+    group = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(group.do("k", fail) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert group.stats() == {"calls": 5, "executed": 1, "coalesced": 4, "in_flight": 0}
+
+def test_new_dataset_version_gets_a_new_key():
+    version = ["v1"]
+    group = SingleFlight("test", lambda: version[0])
+    release = None
+
+    async def compute(built_for):
+        await release.wait()
+        return built_for
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        old = asyncio.ensure_future(group.do("k", compute, "v1"))
+        await asyncio.sleep(0)
+        # The dataset changed while the old computation is still running: don't hand out its result
+        version[0] = "v2"
+        new = asyncio.ensure_future(group.do("k", compute, "v2"))
+        await asyncio.sleep(0)
+        release.set()
+        return await old, await new
+
+    assert asyncio.run(run()) == ("v1", "v2")
+    assert group.key("k") == ("test", "k", "v2")
+    assert group.stats()["executed"] == 2 and group.stats()["coalesced"] == 0
+
+def test_flight_registry_and_stats():
+    group = single_flight.flight("test_registry")
+    assert single_flight.flight("test_registry") is group
+    assert single_flight.stats()["test_registry"] == group.stats()
+    del single_flight.registry["test_registry"]
+
+def test_concurrent_scenario_requests_coalesce():
+    import httpx
+    from main import app, db
+    from api.routes.scenario import scenario_flight
+    db.initialize()
+    before = scenario_flight.stats()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            body = {"iso": "chn", "year": 2040, "military_change": 12.5, "population_change": -3.0}
+            return await asyncio.gather(*(http.post("/api/scenario", json=body) for _ in range(20)))
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.content for r in responses}) == 1
+    after = scenario_flight.stats()
+    assert after["calls"] - before["calls"] == 20
+    assert after["executed"] - before["executed"] >= 1
+    assert after["coalesced"] - before["coalesced"] >= 1
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+def test_bulk_timeseries_is_columnar():
+    response = client.get("/api/timeseries?isos=CHN,usa,zzz,chn&metrics=gdp,gsi&from=2020&to=2025")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["years"] == list(range(2020, 2026))
+    assert payload["metrics"] == ["gdp", "gsi"]
+    # Requested order, duplicates dropped, unknown codes reported rather than failing the request
+    assert list(payload["data"]) == ["chn", "usa"]
+    assert payload["missing"] == ["zzz"]
+    for series in payload["data"].values():
+        assert set(series) == {"gdp", "gsi"}
+        assert all(len(values) == 6 for values in series.values())
+
+    # Same numbers as the row-per-year endpoint
+    rows = {row["year"]: row for row in client.get("/api/timeseries/chn").json()["data"]}
+    assert payload["data"]["chn"]["gdp"] == [rows[year]["gdp"] for year in payload["years"]]
+    assert payload["data"]["chn"]["gsi"] == [rows[year]["gsi"] for year in payload["years"]]
+
+def test_bulk_timeseries_defaults_and_errors():
+    payload = client.get("/api/timeseries").json()
+    countries = client.get("/api/countries").json()
+    assert len(payload["data"]) == len(countries)
+    assert payload["metrics"] == ["gdp", "population", "military", "gsi"]
+    assert payload["years"][0] == 2000 and payload["years"][-1] == 2050
+
+    response = client.get("/api/timeseries?metrics=gdp,happiness")
+    assert response.status_code == 400
+    assert "happiness" in response.json()["detail"]
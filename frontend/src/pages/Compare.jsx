@@ -31,12 +31,20 @@ function Compare() {
   const fetchComparisonData = async () => {
     setLoading(true)
     try {
-      const dataPromises = selectedCountries.map(iso => timeseriesAPI.get(iso))
-      const responses = await Promise.all(dataPromises)
+      // One bulk request; the payload lists years once with per-country metric arrays
+      const response = await timeseriesAPI.getMany(selectedCountries)
+      const { years, metrics, data } = response.data
 
       const combinedData = {}
-      selectedCountries.forEach((iso, index) => {
-        combinedData[iso] = responses[index].data.data || []
+      selectedCountries.forEach(iso => {
+        const series = data[iso]
+        combinedData[iso] = series
+          ? years.map((year, i) => {
+              const row = { year }
+              metrics.forEach(metric => { row[metric] = series[metric][i] })
+              return row
+            })
+          : []
       })
       setComparisonData(combinedData)
     } catch (error) {
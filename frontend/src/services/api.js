@@ -16,6 +16,7 @@ export const countriesAPI = {
 
 export const timeseriesAPI = {
   get: (iso) => api.get(`/timeseries/${iso}`),
+  getMany: (isos, params = {}) => api.get('/timeseries', { params: { isos: isos.join(','), ...params } }),
 }
 
 export const leaderboardAPI = {
@@ -24,10 +25,13 @@ export const leaderboardAPI = {
 
 export const scenarioAPI = {
   run: (data) => api.post('/scenario', data),
+  runBatch: (scenarios) => api.post('/scenario/batch', scenarios),
+  sweep: (data) => api.post('/scenario/sweep', data),
 }
 
 export const insightsAPI = {
   get: (iso) => api.get(`/insights/${iso}`),
+  getMany: (isos) => api.get('/insights', { params: { isos: isos.join(',') } }),
 }
 
 export default api
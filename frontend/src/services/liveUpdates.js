@@ -10,6 +10,9 @@ class LiveUpdateService {
         this.ws = null;
         this.callbacks = [];
         this.currentYear = 2050;
+        // Delta protocol state: latest leaderboard and the sequence number it reflects
+        this.entries = [];
+        this.seq = null;
     }
 
     connect() {
@@ -27,8 +30,11 @@ class LiveUpdateService {
 
         this.ws.onmessage = (event) => {
             try {
-                const data = JSON.parse(event.data);
-                this.notify(data);
+                const message = JSON.parse(event.data);
+                const data = this.applyMessage(message);
+                if (data) {
+                    this.notify(data);
+                }
             } catch (e) {
                 console.error('Error parsing live update:', e);
             }
@@ -48,11 +54,51 @@ class LiveUpdateService {
 
     setYear(year) {
         this.currentYear = year;
+        this.seq = null;
         if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-            this.ws.send(JSON.stringify({ year }));
+            // Opt in to keyframe + delta updates (protocol 2)
+            this.ws.send(JSON.stringify({ year, protocol: 2 }));
         }
     }
 
+    // Returns the updated leaderboard, or null if the message was dropped
+    applyMessage(message) {
+        // Protocol 1: the full leaderboard
+        if (Array.isArray(message)) {
+            return message;
+        }
+        if (message.year !== this.currentYear) {
+            return null;
+        }
+        if (message.type === 'keyframe') {
+            this.entries = message.data;
+            this.seq = message.seq;
+            return this.entries;
+        }
+        if (message.type === 'delta') {
+            if (this.seq === null || message.seq !== this.seq + 1) {
+                // Missed a frame - ask for a fresh keyframe
+                this.seq = null;
+                this.ws.send(JSON.stringify({ resync: true }));
+                return null;
+            }
+            const removed = new Set(message.removed);
+            const entries = this.entries
+                .filter(entry => !removed.has(entry.iso))
+                .map(entry => ({
+                    ...entry,
+                    ...(message.changes[entry.iso] || {}),
+                    rank: message.ranks[entry.iso] ?? entry.rank,
+                }));
+            entries.push(...message.added);
+            entries.sort((a, b) => a.rank - b.rank);
+            this.entries = entries;
+            this.seq = message.seq;
+            return this.entries;
+        }
+        return null;
+    }
+
     subscribe(callback) {
         this.callbacks.push(callback);
         return () => {